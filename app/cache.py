@@ -0,0 +1,97 @@
+"""
+Shared Cache
+Redis client setup for caching data across workers
+"""
+
+import json
+import logging
+import time
+from typing import Any, Optional
+
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# After a Redis failure, skip Redis for this long instead of paying a
+# connect timeout on every request
+RETRY_AFTER_SECONDS = 30
+SOCKET_TIMEOUT_SECONDS = 0.5
+
+
+class Cache:
+    """
+    Redis cache manager.
+
+    All helpers fail open: if Redis is unreachable they behave like a cache
+    miss so callers fall back to the upstream API.
+    """
+
+    def __init__(self):
+        self._client: redis.Redis | None = None
+        self._disabled_until: float = 0.0
+
+    def get_client(self) -> Optional[redis.Redis]:
+        """Get the Redis client, or None while Redis is marked unavailable."""
+        if time.monotonic() < self._disabled_until:
+            return None
+
+        if self._client is None:
+            logger.info("Initializing Redis client...")
+            self._client = redis.Redis.from_url(
+                settings.redis_url,
+                password=settings.redis_password or None,
+                db=settings.redis_db,
+                max_connections=settings.redis_max_connections,
+                socket_timeout=SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=SOCKET_TIMEOUT_SECONDS,
+            )
+        return self._client
+
+    def _mark_unavailable(self, error: Exception):
+        logger.warning(f"Redis unavailable, bypassing for {RETRY_AFTER_SECONDS}s: {error}")
+        self._disabled_until = time.monotonic() + RETRY_AFTER_SECONDS
+
+    def get_json(self, key: str) -> Any:
+        """Get a JSON value, or None on miss or Redis failure."""
+        client = self.get_client()
+        if client is None:
+            return None
+
+        try:
+            raw = client.get(key)
+        except redis.RedisError as e:
+            self._mark_unavailable(e)
+            return None
+
+        if raw is None:
+            return None
+
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            logger.warning(f"Discarding undecodable cache entry {key}")
+            return None
+
+    def set_json(self, key: str, value: Any, ttl_seconds: int):
+        """Store a JSON value with an expiry. Failures are logged and ignored."""
+        client = self.get_client()
+        if client is None:
+            return
+
+        try:
+            client.setex(key, ttl_seconds, json.dumps(value))
+        except redis.RedisError as e:
+            self._mark_unavailable(e)
+
+    def close(self):
+        """Close the Redis connection pool"""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            logger.info("Redis connections closed")
+
+
+# Global cache instance
+cache = Cache()
@@ -12,6 +12,7 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
+import asyncio
 import logging
 import time
 from typing import Dict
@@ -57,7 +58,11 @@ async def lifespan(app: FastAPI):
     from app.database import initialize_database
     await initialize_database()
 
-    # TODO: Initialize Redis connection pool
+    # Redis client is created lazily by app.cache on first use
+
+    # Warm the resolver for outbound weather lookups
+    from app.services.weather_api import warm_dns
+    await asyncio.to_thread(warm_dns)
 
     yield
 
@@ -68,7 +73,16 @@ async def lifespan(app: FastAPI):
     from app.database import close_database
     await close_database()
 
-    # TODO: Close Redis connections
+    # Close Redis connections
+    from app.cache import cache
+    cache.close()
+
+    # Close outbound HTTP clients
+    from app.services.google_places_api import close_async_client
+    await close_async_client()
+
+    from app.services.weather_stats import close_async_client as close_weather_client
+    await close_weather_client()
 
 
 # Determine docs URLs based on environment
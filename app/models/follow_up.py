@@ -16,6 +16,9 @@ class FollowUpOption(BaseModel):
     value: str = Field(..., description="Value to record")
     description: Optional[str] = Field(None, description="Optional longer description")
 
+    class Config:
+        frozen = True
+
 
 class FollowUpQuestion(BaseModel):
     """Follow-up question to ask after status update"""
@@ -27,6 +30,7 @@ class FollowUpQuestion(BaseModel):
     auto_dismiss_seconds: Optional[int] = Field(None, description="Auto-dismiss after N seconds (for acknowledgments)")
 
     class Config:
+        frozen = True
         json_schema_extra = {
             "example": {
                 "question_type": "detention_payment",
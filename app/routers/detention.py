@@ -10,7 +10,7 @@ from typing import Optional
 from uuid import UUID
 from app.database import get_db_admin
 from app.dependencies import get_current_driver
-from app.utils.location import calculate_distance
+from app.utils.location import calculate_distance, is_within_distance
 from app.models.detention import (
     DetentionCheckInRequest,
     DetentionCheckOutRequest,
@@ -597,8 +597,7 @@ async def get_heatmap_data(
 
             # Distance filter if center provided
             if latitude is not None and longitude is not None:
-                distance = calculate_distance(latitude, longitude, fac_lat, fac_lng)
-                if distance > radius_miles:
+                if not is_within_distance(latitude, longitude, fac_lat, fac_lng, radius_miles):
                     continue
 
             avg_det = float(row.get("avg_detention_minutes") or 0)
@@ -15,7 +15,7 @@ from app.models.integrations import (
     GooglePlacesConfirmRequest,
     RoleDetailsUpdateRequest,
 )
-from app.services.google_places_api import search_places
+from app.services.google_places_api import search_places_async
 from app.services.profile_completion import calculate_completion, check_badges
 from app.config import settings
 from app.dependencies import get_current_driver
@@ -61,12 +61,13 @@ def _save_role_details_and_badges(db: Client, driver_id: str, profile: dict, rol
     if isinstance(existing_badges, str):
         existing_badges = json.loads(existing_badges)
 
-    updated_badges = check_badges(merged, existing_badges)
+    completion = calculate_completion(merged)
+    updated_badges = check_badges(merged, existing_badges, completion=completion)
 
     update_dict = {
         "role_details": json.dumps(role_details),
         "badges": json.dumps(updated_badges),
-        "completion_percentage": calculate_completion(merged),
+        "completion_percentage": completion,
     }
 
     response = db.from_("professional_profiles").update(update_dict).eq(
@@ -102,7 +103,7 @@ async def search_google_places(
         )
 
     try:
-        results = search_places(
+        results = await search_places_async(
             query=body.query,
             api_key=settings.google_api_key,
             location=body.location,
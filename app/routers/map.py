@@ -506,10 +506,10 @@ async def get_weather_at_location(
     Returns current temperature, conditions, and city name.
     Cached for 30 minutes to reduce API calls.
     """
-    from app.services.weather_stats import get_current_conditions, format_conditions_detailed
+    from app.services.weather_stats import get_current_conditions_async, format_conditions_detailed
     
     try:
-        conditions = get_current_conditions(latitude, longitude)
+        conditions = await get_current_conditions_async(latitude, longitude)
         
         if not conditions:
             return {
@@ -147,7 +147,9 @@ async def create_professional_profile(
         profile_dict["completion_percentage"] = calculate_completion(profile_dict)
 
         # Check and award badges
-        profile_dict["badges"] = json.dumps(check_badges(profile_dict))
+        profile_dict["badges"] = json.dumps(
+            check_badges(profile_dict, completion=profile_dict["completion_percentage"])
+        )
 
         # Insert profile
         response = db.from_("professional_profiles").insert(profile_dict).execute()
@@ -277,7 +279,9 @@ async def update_my_professional_profile(
         existing_badges = current_profile.get("badges", [])
         if isinstance(existing_badges, str):
             existing_badges = json.loads(existing_badges)
-        updated_badges = check_badges(merged_profile, existing_badges)
+        updated_badges = check_badges(
+            merged_profile, existing_badges, completion=update_dict["completion_percentage"]
+        )
         update_dict["badges"] = json.dumps(updated_badges)
 
         # Update profile
@@ -240,7 +240,7 @@ async def search_facilities(
         # 2. If fewer than 5 local results and we have a query, try Google Places
         if len(local_results) < 5 and (q or (lat and lng)):
             try:
-                from app.services.google_places_api import search_places
+                from app.services.google_places_api import search_places_async
                 from app.config import settings
 
                 google_api_key = getattr(settings, "google_places_api_key", None) or \
@@ -252,7 +252,7 @@ async def search_facilities(
                         location_str = f"{lat},{lng}"
 
                     search_query = q or "truck stop"
-                    google_results = search_places(
+                    google_results = await search_places_async(
                         query=search_query,
                         api_key=google_api_key,
                         location=location_str,
@@ -4,12 +4,20 @@ On-demand facility lookup with OSM fallback for unmapped areas
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+try:
+    import orjson  # Faster decoding of large Overpass responses, if installed
+except ImportError:
+    orjson = None
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+from postgrest.exceptions import APIError
 from supabase import Client
 
-from app.utils.location import calculate_distance
+from app.cache import cache
+from app.utils.location import calculate_distance, calculate_distances
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +26,33 @@ logger = logging.getLogger(__name__)
 GEOHASH_PRECISION = 6
 QUERY_RADIUS_MILES = 5.0  # Query 5 mile radius from driver location
 CACHE_REFRESH_DAYS = 30  # Re-query areas after 30 days
+METERS_PER_MILE = 1609.344
+OSM_NEARBY_CACHE_PREFIX = "osm:nearby:"
+OSM_NEARBY_CACHE_SECONDS = 7 * 24 * 3600  # Shared Overpass result cache
+DUPLICATE_LOOKUPS_PER_QUERY = 50  # OSM IDs / geohash cells per query, keeps filter URLs short
+
+# Cleared if the nearest_facility() function isn't deployed
+_nearest_rpc_available = True
+
+# Shared session for Overpass calls, so discoveries reuse a keep-alive
+# connection instead of paying a TLS handshake each time. Only rate-limit
+# and gateway responses are retried; a timed-out query is not re-run
+# because the caller is waiting on it.
+overpass_session = requests.Session()
+overpass_session.headers.update({"User-Agent": "FindTruckDriver/1.0 (contact@findtruckdriver.com)"})
+overpass_session.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=2,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset({"POST"}),
+        respect_retry_after_header=False,  # Don't sleep out a long Retry-After mid-request
+        raise_on_status=False,
+    ),
+))
 
 
 def encode_geohash(latitude: float, longitude: float, precision: int = 6) -> str:
@@ -95,53 +130,59 @@ def query_osm_nearby(latitude: float, longitude: float, radius_miles: float = 5.
 
     overpass_url = "https://overpass-api.de/api/interpreter"
 
-    # Query for truck-related facilities AND business locations
+    # Query for truck-related facilities AND business locations.
+    # nw matches nodes and ways, anchored regexes stand in for several exact
+    # values, and the global bbox applies to every statement, so the server
+    # runs 6 statements instead of 20 for the same result.
     query = f"""
-    [out:json][timeout:30];
+    [out:json][timeout:30][bbox:{south},{west},{north},{east}];
     (
       // Truck stops and fuel
-      node["amenity"="fuel"]["hgv"="yes"]({south},{west},{north},{east});
-      way["amenity"="fuel"]["hgv"="yes"]({south},{west},{north},{east});
-      node["amenity"="fuel"]["name"~"(Love|Pilot|Flying J|TA|Petro)",i]({south},{west},{north},{east});
-      way["amenity"="fuel"]["name"~"(Love|Pilot|Flying J|TA|Petro)",i]({south},{west},{north},{east});
+      nw["amenity"="fuel"]["hgv"="yes"];
+      nw["amenity"="fuel"]["name"~"(Love|Pilot|Flying J|TA|Petro)",i];
 
       // Rest areas and service plazas
-      node["highway"="rest_area"]({south},{west},{north},{east});
-      way["highway"="rest_area"]({south},{west},{north},{east});
-      node["highway"="services"]({south},{west},{north},{east});
-      way["highway"="services"]({south},{west},{north},{east});
+      nw["highway"~"^(rest_area|services)$"];
 
       // Warehouses and distribution centers
-      node["building"="warehouse"]({south},{west},{north},{east});
-      way["building"="warehouse"]({south},{west},{north},{east});
-      node["building"="industrial"]({south},{west},{north},{east});
-      way["building"="industrial"]({south},{west},{north},{east});
-      node["industrial"="distribution"]({south},{west},{north},{east});
-      way["industrial"="distribution"]({south},{west},{north},{east});
+      nw["building"~"^(warehouse|industrial)$"];
+      nw["industrial"="distribution"];
 
       // Commercial/retail buildings with names (like Walmart DC, Target DC, etc.)
-      node["building"="retail"]["name"]({south},{west},{north},{east});
-      way["building"="retail"]["name"]({south},{west},{north},{east});
-      node["building"="commercial"]["name"]({south},{west},{north},{east});
-      way["building"="commercial"]["name"]({south},{west},{north},{east});
+      nw["building"~"^(retail|commercial)$"]["name"];
     );
     out center tags;
     """
 
+    # Nearby drivers (within ~100 m) share one cached result
+    cache_key = f"{OSM_NEARBY_CACHE_PREFIX}{latitude:.3f},{longitude:.3f},{radius_miles}"
+    cached = cache.get_json(cache_key)
+    if cached is not None:
+        logger.info(f"Found {len(cached)} facilities from OSM (cached)")
+        return cached
+
     logger.info(f"Querying OSM for facilities near ({latitude:.4f}, {longitude:.4f}) r={radius_miles}mi")
 
     try:
-        response = requests.post(
+        response = overpass_session.post(
             overpass_url,
             data={"data": query},
             timeout=35  # Slightly longer than query timeout
         )
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content) if orjson else response.json()
+
+        # Timeouts and out-of-memory aborts come back as HTTP 200 with a
+        # remark and empty or partial elements; don't cache or use them
+        remark = data.get("remark") or ""
+        if "runtime error" in remark:
+            logger.error(f"OSM query failed: {remark}")
+            return []
 
         elements = data.get("elements", [])
         logger.info(f"Found {len(elements)} facilities from OSM")
 
+        cache.set_json(cache_key, elements, OSM_NEARBY_CACHE_SECONDS)
         return elements
 
     except requests.exceptions.Timeout:
@@ -150,6 +191,10 @@ def query_osm_nearby(latitude: float, longitude: float, radius_miles: float = 5.
     except requests.exceptions.RequestException as e:
         logger.error(f"OSM query failed: {e}")
         return []
+    except ValueError as e:
+        # orjson raises its own decode error, outside the requests hierarchy
+        logger.error(f"Invalid JSON from OSM query: {e}")
+        return []
 
 
 def parse_osm_element(element: Dict) -> Optional[Dict]:
@@ -283,8 +328,12 @@ def check_duplicate_facility(db: Client, facility: Dict, threshold_miles: float
     if not nearby.data:
         return False
 
-    # Check distance and name similarity
-    for existing in nearby.data:
+    return _matches_nearby(facility, nearby.data, threshold_miles)
+
+
+def _matches_nearby(facility: Dict, nearby: List[Dict], threshold_miles: float) -> bool:
+    """Check whether any nearby facility is close enough with a similar name."""
+    for existing in nearby:
         distance = calculate_distance(
             facility["latitude"],
             facility["longitude"],
@@ -304,6 +353,54 @@ def check_duplicate_facility(db: Client, facility: Dict, threshold_miles: float
     return False
 
 
+def _filter_new_facilities(db: Client, facilities: List[Dict], threshold_miles: float = 0.05) -> List[Dict]:
+    """
+    Drop facilities that already exist, by the same rules as
+    check_duplicate_facility.
+
+    Existing rows are fetched for the whole batch in chunked OSM ID and
+    geohash cell queries instead of two queries per facility. Repeats
+    within the batch are dropped too, as inserting one at a time would.
+    """
+    osm_ids = sorted({f["osm_id"] for f in facilities if f.get("osm_id")})
+    known_osm_ids = set()
+    for i in range(0, len(osm_ids), DUPLICATE_LOOKUPS_PER_QUERY):
+        result = db.from_("facilities") \
+            .select("osm_id") \
+            .in_("osm_id", osm_ids[i:i + DUPLICATE_LOOKUPS_PER_QUERY]) \
+            .execute()
+        known_osm_ids.update(row["osm_id"] for row in result.data or [])
+
+    # Same ≈ 1km geohash cells check_duplicate_facility compares against
+    prefixes = sorted({f["geohash"][:6] for f in facilities})
+    nearby_by_prefix: Dict[str, List[Dict]] = {prefix: [] for prefix in prefixes}
+    for i in range(0, len(prefixes), DUPLICATE_LOOKUPS_PER_QUERY):
+        chunk = prefixes[i:i + DUPLICATE_LOOKUPS_PER_QUERY]
+        result = db.from_("facilities") \
+            .select("id,name,latitude,longitude,geohash") \
+            .or_(",".join(f"geohash.like.{prefix}%" for prefix in chunk)) \
+            .execute()
+        for row in result.data or []:
+            nearby_by_prefix[row["geohash"][:6]].append(row)
+
+    new_facilities = []
+    for facility in facilities:
+        if facility.get("osm_id") in known_osm_ids:
+            logger.debug(f"Facility duplicate found by OSM ID: {facility['osm_id']}")
+            continue
+
+        nearby = nearby_by_prefix[facility["geohash"][:6]]
+        if _matches_nearby(facility, nearby, threshold_miles):
+            continue
+
+        new_facilities.append(facility)
+        if facility.get("osm_id"):
+            known_osm_ids.add(facility["osm_id"])
+        nearby.append(facility)
+
+    return new_facilities
+
+
 def discover_facilities(db: Client, latitude: float, longitude: float) -> int:
     """
     Discover and import facilities for a location if not already cached.
@@ -325,34 +422,62 @@ def discover_facilities(db: Client, latitude: float, longitude: float) -> int:
         _update_query_cache(db, latitude, longitude, 0)
         return 0
 
-    # Parse and import facilities
-    imported = 0
+    # Parse facilities and drop ones we already have
+    facilities = []
     for element in osm_elements:
         facility = parse_osm_element(element)
+        if facility:
+            facilities.append(facility)
 
-        if not facility:
-            continue
+    try:
+        new_facilities = _filter_new_facilities(db, facilities) if facilities else []
+    except Exception as e:
+        # Leave the area uncached so the next lookup retries discovery
+        logger.error(f"Failed to check OSM facilities for duplicates: {e}")
+        return 0
 
-        # Check for duplicates
-        if check_duplicate_facility(db, facility):
-            continue
+    imported, failed = _insert_facilities(db, new_facilities)
 
-        # Insert facility
+    logger.info(f"Imported {imported} new facilities from {len(osm_elements)} OSM elements")
+
+    # Update query cache, unless some facilities still need importing
+    if failed:
+        logger.warning(f"{failed} facilities failed to import; area will be queried again")
+    else:
+        _update_query_cache(db, latitude, longitude, len(osm_elements))
+
+    return imported
+
+
+def _insert_facilities(db: Client, facilities: List[Dict]) -> Tuple[int, int]:
+    """
+    Insert facilities in one request, falling back to one row at a time if
+    the batch is rejected so a single bad row doesn't drop the rest.
+
+    Returns (imported, failed) counts.
+    """
+    if not facilities:
+        return 0, 0
+
+    try:
+        result = db.from_("facilities").insert(facilities).execute()
+        return len(result.data or []), 0
+    except Exception as e:
+        logger.warning(f"Batch insert of {len(facilities)} facilities failed, retrying individually: {e}")
+
+    imported = 0
+    failed = 0
+    for facility in facilities:
         try:
             result = db.from_("facilities").insert(facility).execute()
             if result.data:
                 imported += 1
                 logger.debug(f"Imported facility: {facility['name']}")
         except Exception as e:
+            failed += 1
             logger.error(f"Failed to import facility {facility['name']}: {e}")
-            continue
 
-    logger.info(f"Imported {imported} new facilities from {len(osm_elements)} OSM elements")
-
-    # Update query cache
-    _update_query_cache(db, latitude, longitude, len(osm_elements))
-
-    return imported
+    return imported, failed
 
 
 def _update_query_cache(db: Client, latitude: float, longitude: float, facilities_found: int):
@@ -417,6 +542,81 @@ def find_nearby_facility(
         Tuple of (facility_id, facility_name) or (None, None)
     """
 
+    nearest = _nearest_facility_rpc(db, latitude, longitude, max_distance_miles)
+    if nearest is not None:
+        nearest_facility, nearest_distance = nearest
+    else:
+        nearest_facility, nearest_distance = _nearest_facility_scan(db, latitude, longitude, max_distance_miles)
+
+    if nearest_facility:
+        logger.debug(f"Found facility {nearest_facility['name']} at {nearest_distance:.2f} miles")
+        return nearest_facility["id"], nearest_facility["name"]
+
+    # No facility found - trigger discovery if enabled
+    if discover_if_missing:
+        logger.info(f"No facility found near ({latitude:.4f}, {longitude:.4f}), triggering discovery")
+
+        # Discover facilities (synchronous for now, can be made async later)
+        discovered = discover_facilities(db, latitude, longitude)
+
+        if discovered > 0:
+            # Retry the search
+            return find_nearby_facility(db, latitude, longitude, max_distance_miles, discover_if_missing=False)
+
+    logger.debug(f"No facility within {max_distance_miles} miles of ({latitude:.4f}, {longitude:.4f})")
+    return None, None
+
+
+def _nearest_facility_rpc(
+    db: Client,
+    latitude: float,
+    longitude: float,
+    max_distance_miles: float
+) -> Optional[Tuple[Optional[Dict], float]]:
+    """
+    Nearest facility via the nearest_facility() SQL function (migration 018),
+    which uses the geog GIST index instead of scanning a bounding box.
+
+    Returns (facility or None, distance in miles), or None if the function
+    couldn't be called so the caller falls back to a client-side scan.
+    """
+    global _nearest_rpc_available
+    if not _nearest_rpc_available:
+        return None
+
+    try:
+        result = db.rpc("nearest_facility", {
+            "p_latitude": latitude,
+            "p_longitude": longitude,
+            "p_max_meters": max_distance_miles * METERS_PER_MILE,
+        }).execute()
+    except APIError as e:
+        if e.code == "PGRST202":
+            # Function not deployed yet; stop trying for this process
+            logger.warning("nearest_facility() not found, using bounding box scan (apply migration 018)")
+            _nearest_rpc_available = False
+        else:
+            logger.warning(f"nearest_facility() failed, using bounding box scan: {e}")
+        return None
+    except Exception as e:
+        logger.warning(f"nearest_facility() failed, using bounding box scan: {e}")
+        return None
+
+    if not result.data:
+        return None, float('inf')
+
+    row = result.data[0]
+    return row, row["distance_meters"] / METERS_PER_MILE
+
+
+def _nearest_facility_scan(
+    db: Client,
+    latitude: float,
+    longitude: float,
+    max_distance_miles: float
+) -> Tuple[Optional[Dict], float]:
+    """Nearest facility by fetching a bounding box and measuring client-side."""
+
     # Calculate bounding box for search (search slightly wider to catch nearby cells)
     # 0.3 miles ≈ 0.0044 degrees latitude, 0.0045 degrees longitude (at ~37° latitude)
     search_radius_deg = max_distance_miles / 69.0 * 1.5  # 1.5x wider for safety
@@ -440,30 +640,13 @@ def find_nearby_facility(
     nearest_distance = float('inf')
 
     if facilities.data:
-        for facility in facilities.data:
-            distance = calculate_distance(
-                latitude, longitude,
-                facility["latitude"], facility["longitude"]
-            )
-
+        distances = calculate_distances(
+            latitude, longitude,
+            ((f["latitude"], f["longitude"]) for f in facilities.data)
+        )
+        for facility, distance in zip(facilities.data, distances):
             if distance <= max_distance_miles and distance < nearest_distance:
                 nearest_facility = facility
                 nearest_distance = distance
 
-    if nearest_facility:
-        logger.debug(f"Found facility {nearest_facility['name']} at {nearest_distance:.2f} miles")
-        return nearest_facility["id"], nearest_facility["name"]
-
-    # No facility found - trigger discovery if enabled
-    if discover_if_missing:
-        logger.info(f"No facility found near ({latitude:.4f}, {longitude:.4f}), triggering discovery")
-
-        # Discover facilities (synchronous for now, can be made async later)
-        discovered = discover_facilities(db, latitude, longitude)
-
-        if discovered > 0:
-            # Retry the search
-            return find_nearby_facility(db, latitude, longitude, max_distance_miles, discover_if_missing=False)
-
-    logger.debug(f"No facility within {max_distance_miles} miles of ({latitude:.4f}, {longitude:.4f})")
-    return None, None
+    return nearest_facility, nearest_distance
@@ -38,17 +38,62 @@ from app.models.follow_up import (
     build_weather_good_message
 )
 from app.utils.location import calculate_distance
-from app.services.weather_api import (
-    get_weather_alerts,
-    should_warn_driver,
-    get_most_severe_alert,
-    get_alert_emoji,
-    get_weather_summary
-)
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fixed messages with no per-call data, built once and shared.
+# FollowUpQuestion is frozen so the shared instances can't be modified.
+_PARKING_VIBE_QUESTION = build_parking_vibe_question()
+_READY_TO_ROLL_QUESTION = build_ready_to_roll_question()
+_DRIVE_SAFE_MESSAGE = build_drive_safe_message()
+_FIRST_TIME_PARKED_QUESTION = build_first_time_parked_question()
+_FIRST_TIME_ROLLING_MESSAGE = build_first_time_rolling_message()
+_CHECKIN_PARKED_SHORT = build_checkin_parked_short()
+_CHECKIN_PARKED_LONG = build_checkin_parked_long()
+_CHECKIN_WAITING = build_checkin_waiting()
+_CHECKIN_ROLLING = build_checkin_rolling()
+_CALLING_IT_A_NIGHT_QUESTION = build_calling_it_a_night_question()
+
+
+FAR_FROM_FACILITY_MILES = 10.0
+DRIVE_SECONDS_PER_MILE = 120  # Rough estimate: 30mph avg
+MIN_NEARBY_DETENTION_SECONDS = 3600
+
+
+def estimate_detention_seconds(
+    wait_seconds: int,
+    distance_miles: Optional[float],
+    is_same_location: Optional[bool],
+    is_nearby: Optional[bool]
+) -> Optional[int]:
+    """
+    Estimate detention time for a WAITING → ROLLING transition.
+
+    Pure numeric decision with no question building, so it can also be used
+    when recomputing detention stats over historical transitions.
+
+    Returns:
+        Detention seconds worth asking about, or None if no question applies
+    """
+    # Far from facility - updated late, moment has passed
+    if distance_miles and distance_miles > FAR_FROM_FACILITY_MILES:
+        return None
+
+    # Still at facility (< 1 mile) - full wait time
+    if is_same_location:
+        return wait_seconds
+
+    # Nearby (1-10 miles) - probably drove to a truck stop after loading,
+    # so subtract the estimated drive time
+    if is_nearby:
+        estimated_drive_seconds = int(distance_miles * DRIVE_SECONDS_PER_MILE)
+        estimated_wait_seconds = max(0, wait_seconds - estimated_drive_seconds)
+        if estimated_wait_seconds > MIN_NEARBY_DETENTION_SECONDS:
+            return estimated_wait_seconds
+
+    return None
+
 
 class FollowUpEngine:
     """
@@ -85,7 +130,8 @@ class FollowUpEngine:
         is_same_location = distance_miles < 1.0
         is_nearby = distance_miles < 10.0
 
-        return StatusContext(
+        # Values are computed here, so skip pydantic validation
+        return StatusContext.model_construct(
             prev_status=prev_status,
             prev_latitude=prev_latitude,
             prev_longitude=prev_longitude,
@@ -122,18 +168,18 @@ class FollowUpEngine:
 
         # CASE 1: First time user (no previous status)
         if not prev_status:
-            logger.info(f"First-time user - showing welcome message for {new_status}")
+            logger.info("First-time user - showing welcome message for %s", new_status)
             return FollowUpEngine._first_time_flow(new_status, facility_name)
 
         # CASE 2: Returning user (24+ hours away)
         if context.time_since_hours and context.time_since_hours >= 24:
             days_away = int(context.time_since_hours / 24)
-            logger.info(f"Returning user after {days_away} days - showing welcome back")
+            logger.info("Returning user after %s days - showing welcome back", days_away)
             return build_returning_user_question(new_status, days_away, facility_name)
 
         # CASE 3: Check-in (same status)
         if new_status == prev_status:
-            logger.info(f"Check-in for {new_status} status")
+            logger.info("Check-in for %s status", new_status)
             return FollowUpEngine._check_in_flow(new_status, context)
 
         # CASE 4: Status transition
@@ -144,64 +190,6 @@ class FollowUpEngine:
             facility_name=facility_name
         )
 
-    @staticmethod
-    def _check_weather(
-        new_status: str,
-        latitude: float,
-        longitude: float
-    ) -> Optional[FollowUpQuestion]:
-        """
-        Check for severe weather and return appropriate question.
-
-        Safety is top priority - weather alerts override other questions.
-        """
-        try:
-            alerts = get_weather_alerts(latitude, longitude)
-
-            if not alerts:
-                return None
-
-            # Check if we should warn the driver
-            if not should_warn_driver(alerts, new_status):
-                return None
-
-            most_severe = get_most_severe_alert(alerts)
-            if not most_severe:
-                return None
-
-            emoji = get_alert_emoji(most_severe.event)
-            weather_summary = get_weather_summary(alerts)
-
-            logger.info(
-                f"Severe weather detected: {most_severe.event} "
-                f"(severity: {most_severe.severity}, urgency: {most_severe.urgency})"
-            )
-
-            # Different questions based on driver status
-            if new_status == "rolling":
-                # Driver is driving - ask if they're safe
-                return build_weather_alert_question(
-                    most_severe.event,
-                    most_severe.headline,
-                    emoji
-                )
-
-            elif new_status == "waiting":
-                # Driver is waiting - light check on conditions
-                if weather_summary:
-                    return build_weather_check_question(weather_summary)
-
-            elif new_status == "parked":
-                # Driver is parked - encourage staying safe
-                if weather_summary:
-                    return build_weather_stay_safe_message(weather_summary)
-
-            return None
-
-        except Exception as e:
-            logger.error(f"Weather check failed: {e}", exc_info=True)
-            return None
-
     @staticmethod
     def _first_time_flow(new_status: str, facility_name: Optional[str]) -> FollowUpQuestion:
         """
@@ -209,11 +197,11 @@ class FollowUpEngine:
         Show welcoming message with appropriate question for their status.
         """
         if new_status == "parked":
-            return build_first_time_parked_question()
+            return _FIRST_TIME_PARKED_QUESTION
         elif new_status == "waiting":
             return build_first_time_waiting_question(facility_name)
         else:  # rolling
-            return build_first_time_rolling_message()
+            return _FIRST_TIME_ROLLING_MESSAGE
 
     @staticmethod
     def _check_in_flow(status: str, context: StatusContext) -> Optional[FollowUpQuestion]:
@@ -226,18 +214,18 @@ class FollowUpEngine:
         if status == "parked":
             if time_in_status_hours < 2:
                 # Short time - just acknowledge location update
-                return build_checkin_parked_short()
+                return _CHECKIN_PARKED_SHORT
             else:
                 # Longer time - re-ask about spot quality (things change)
-                return build_checkin_parked_long()
+                return _CHECKIN_PARKED_LONG
 
         elif status == "waiting":
             # Always re-ask - facility flow changes frequently
-            return build_checkin_waiting()
+            return _CHECKIN_WAITING
 
         else:  # rolling
             # Just acknowledge - they're driving
-            return build_checkin_rolling()
+            return _CHECKIN_ROLLING
 
     @staticmethod
     def _handle_transition(
@@ -254,7 +242,10 @@ class FollowUpEngine:
         """
 
         transition = f"{prev_status}→{new_status}"
-        logger.info(f"Transition: {transition}, time: {context.time_since_hours:.1f}h, distance: {context.distance_miles:.1f}mi")
+        logger.info(
+            "Transition: %s, time: %.1fh, distance: %.1fmi",
+            transition, context.time_since_hours, context.distance_miles
+        )
 
         # ========================================
         # ASK ON ENTRY: Phone is in hand, has time
@@ -267,18 +258,18 @@ class FollowUpEngine:
                 return FollowUpEngine._waiting_to_parked(context, facility_name)
             # ROLLING → PARKED (normal parking)
             else:
-                logger.info(f"Entering PARKED - asking about spot")
+                logger.info("Entering PARKED - asking about spot")
                 return build_parking_spot_question(facility_name)
 
         # → WAITING: Context-based question
         elif new_status == "waiting":
             # PARKED → WAITING (woke up, ready to work)
             if prev_status == "parked":
-                logger.info(f"PARKED → WAITING - time to work")
+                logger.info("PARKED → WAITING - time to work")
                 return build_time_to_work_question(facility_name)
             # ROLLING → WAITING (normal arrival)
             else:
-                logger.info(f"Entering WAITING - asking about facility flow")
+                logger.info("Entering WAITING - asking about facility flow")
                 return build_facility_flow_question(facility_name)
 
         # ========================================
@@ -287,8 +278,8 @@ class FollowUpEngine:
 
         # → ROLLING from PARKED: Just encouragement
         elif prev_status == "parked" and new_status == "rolling":
-            logger.info(f"PARKED → ROLLING: Drive safe message")
-            return build_drive_safe_message()
+            logger.info("PARKED → ROLLING: Drive safe message")
+            return _DRIVE_SAFE_MESSAGE
 
         # → ROLLING from WAITING: Check detention time
         elif prev_status == "waiting" and new_status == "rolling":
@@ -296,14 +287,14 @@ class FollowUpEngine:
 
         # → ROLLING from anywhere else: Just encouragement
         elif new_status == "rolling":
-            logger.info(f"{prev_status} → ROLLING: Drive safe message")
-            return build_drive_safe_message()
+            logger.info("%s → ROLLING: Drive safe message", prev_status)
+            return _DRIVE_SAFE_MESSAGE
 
         # ========================================
         # Other transitions
         # ========================================
         else:
-            logger.info(f"Transition {transition} - no follow-up question")
+            logger.info("Transition %s - no follow-up question", transition)
             return None
 
     @staticmethod
@@ -318,37 +309,21 @@ class FollowUpEngine:
         This is THE GOLD - actual detention data from real drivers
         """
 
-        wait_seconds = context.time_since_seconds or 0
-        still_at_facility = context.is_same_location
-
-        # CASE A: They're far from facility - updated late
-        if context.distance_miles and context.distance_miles > 10:
-            # They forgot to update, now 50 miles away
-            # Don't ask about detention - moment has passed
-            # We can still LOG the approximate wait time silently
-            logger.info(f"Far from facility ({context.distance_miles:.1f}mi) - skipping detention question")
-            return None
-
-        # CASE B: Still at facility (< 1 mile) - ask based on wait time
-        if still_at_facility:
-            return build_detention_question(wait_seconds, facility_name)
-
-        # CASE C: Nearby but not at facility (1-10 miles)
-        # They might have driven to truck stop after getting loaded
-        elif context.is_nearby:
-            # Estimate drive time and subtract from wait
-            estimated_drive_mins = context.distance_miles * 2  # Rough estimate: 30mph avg
-            estimated_drive_seconds = int(estimated_drive_mins * 60)
-            estimated_wait_seconds = max(0, wait_seconds - estimated_drive_seconds)
+        detention_seconds = estimate_detention_seconds(
+            context.time_since_seconds or 0,
+            context.distance_miles,
+            context.is_same_location,
+            context.is_nearby
+        )
 
-            if estimated_wait_seconds > 3600:  # More than 1 hour
-                return build_detention_question(estimated_wait_seconds, facility_name)
-            else:
-                # Short wait, no need to ask
-                return None
+        if detention_seconds is None:
+            if context.distance_miles and context.distance_miles > FAR_FROM_FACILITY_MILES:
+                # They forgot to update, now 50 miles away
+                # Don't ask about detention - moment has passed
+                logger.info("Far from facility (%.1fmi) - skipping detention question", context.distance_miles)
+            return None
 
-        # CASE D: Default - no question
-        return None
+        return build_detention_question(detention_seconds, facility_name)
 
     @staticmethod
     def _waiting_to_parked(
@@ -370,24 +345,24 @@ class FollowUpEngine:
 
         # CASE A: Same location - probably parking at facility overnight
         if distance < 0.5:
-            logger.info(f"WAITING → PARKED same location - calling it a night?")
-            return build_calling_it_a_night_question()
+            logger.info("WAITING → PARKED same location - calling it a night?")
+            return _CALLING_IT_A_NIGHT_QUESTION
 
         # CASE B: Nearby (<15 miles) - drove to truck stop after load
         elif distance < 15:
             # Long wait (2+ hours) - ask about detention
             if wait_seconds >= 7200:  # 2 hours
                 prev_facility = facility_name or "the facility"
-                logger.info(f"WAITING → PARKED nearby after {wait_seconds}s wait - detention question")
+                logger.info("WAITING → PARKED nearby after %ss wait - detention question", wait_seconds)
                 return build_done_at_facility_question(prev_facility, wait_seconds)
             # Short wait - just ask about parking spot
             else:
-                logger.info(f"WAITING → PARKED nearby after short wait - ask about spot")
+                logger.info("WAITING → PARKED nearby after short wait - ask about spot")
                 return build_parking_spot_question(facility_name)
 
         # CASE C: Far away - forgot to update, just ask about current spot
         else:
-            logger.info(f"WAITING → PARKED far away ({distance:.1f}mi) - ask about spot")
+            logger.info("WAITING → PARKED far away (%.1fmi) - ask about spot", distance)
             return build_parking_spot_question(facility_name)
 
     @staticmethod
@@ -407,22 +382,22 @@ class FollowUpEngine:
         # CASE A: Normal overnight rest (6-14 hours, same spot)
         if 6 <= parked_hours < 14 and same_spot:
             # They slept here - ask about the spot vibe
-            return build_parking_vibe_question()
+            return _PARKING_VIBE_QUESTION
 
         # CASE B: Short rest (< 6 hours)
         elif parked_hours < 6 and same_spot:
             # Quick break - just acknowledge
-            logger.info(f"Short rest ({parked_hours:.1f}h) - no question")
+            logger.info("Short rest (%.1fh) - no question", parked_hours)
             return None
 
         # CASE C: Long rest (14+ hours) - maybe took 34-hour reset
         elif parked_hours >= 14 and same_spot:
             # Long rest - ask about readiness
-            return build_ready_to_roll_question()
+            return _READY_TO_ROLL_QUESTION
 
         # CASE D: Different location - they moved without updating
         else:
-            logger.info(f"Different location or unusual time - no question")
+            logger.info("Different location or unusual time - no question")
             return None
 
 
@@ -452,10 +427,8 @@ def determine_follow_up(
         Either question can be None if not appropriate
     """
 
-    engine = FollowUpEngine()
-
     # Calculate context
-    context = engine.calculate_context(
+    context = FollowUpEngine.calculate_context(
         prev_status=prev_status,
         prev_latitude=prev_latitude,
         prev_longitude=prev_longitude,
@@ -465,7 +438,7 @@ def determine_follow_up(
     )
 
     # Get primary follow-up question (NOT weather)
-    primary_question = engine.get_follow_up_question(
+    primary_question = FollowUpEngine.get_follow_up_question(
         new_status=new_status,
         context=context,
         facility_name=facility_name,
@@ -482,6 +455,33 @@ def determine_follow_up(
 
     return context, primary_question, weather_question
 
+def _weather_alert_question(alert, emoji: str, summary: str) -> FollowUpQuestion:
+    return build_weather_alert_question(alert.event, alert.headline, emoji)
+
+
+def _weather_check_question(alert, emoji: str, summary: str) -> FollowUpQuestion:
+    return build_weather_check_question(summary)
+
+
+def _weather_stay_safe_message(alert, emoji: str, summary: str) -> FollowUpQuestion:
+    return build_weather_stay_safe_message(summary)
+
+
+# (alert severity, driver status) -> question builder.
+# Severe/Extreme: rolling drivers get the safety check, waiting drivers are
+# asked about road conditions, parked drivers are told to stay put.
+# Moderate: only rolling drivers are asked about road conditions.
+_WEATHER_QUESTIONS = {
+    ("Extreme", "rolling"): _weather_alert_question,
+    ("Extreme", "waiting"): _weather_check_question,
+    ("Extreme", "parked"): _weather_stay_safe_message,
+    ("Severe", "rolling"): _weather_alert_question,
+    ("Severe", "waiting"): _weather_check_question,
+    ("Severe", "parked"): _weather_stay_safe_message,
+    ("Moderate", "rolling"): _weather_check_question,
+}
+
+
 def get_weather_info(
     new_status: str,
     latitude: float,
@@ -501,6 +501,9 @@ def get_weather_info(
     Returns:
         Weather alert question, or None if no alerts or not severe enough
     """
+    # Imported lazily so endpoints that never check weather don't load the NWS client
+    from app.services.weather_api import get_weather_alerts, get_most_severe_alert, get_alert_emoji
+
     try:
         alerts = get_weather_alerts(latitude, longitude)
 
@@ -513,39 +516,20 @@ def get_weather_info(
         if not most_severe:
             return None
 
-        emoji = get_alert_emoji(most_severe.event)
-        weather_summary = get_weather_summary(alerts)
-
         logger.info(
-            f"Weather alert: {most_severe.event} "
-            f"(severity: {most_severe.severity}, urgency: {most_severe.urgency})"
+            "Weather alert: %s (severity: %s, urgency: %s)",
+            most_severe.event, most_severe.severity, most_severe.urgency
         )
 
-        # Only show alerts for Severe/Extreme weather
-        if most_severe.severity in ["Severe", "Extreme"]:
-            # Different questions based on driver status
-            if new_status == "rolling":
-                # CRITICAL: Driver is driving in severe weather
-                return build_weather_alert_question(
-                    most_severe.event,
-                    most_severe.headline,
-                    emoji
-                )
-            elif new_status == "waiting":
-                # Ask about road conditions
-                return build_weather_check_question(weather_summary)
-            else:  # parked
-                # Encourage staying safe
-                return build_weather_stay_safe_message(weather_summary)
-
-        # Moderate alerts - only warn rolling drivers
-        elif most_severe.severity == "Moderate":
-            if new_status == "rolling":
-                return build_weather_check_question(weather_summary)
-
-        # Not severe enough to warrant a follow-up question
-        logger.info(f"Weather alert not severe enough for follow-up: {most_severe.severity}")
-        return None
+        build = _WEATHER_QUESTIONS.get((most_severe.severity, new_status))
+        if build is None:
+            # Not severe enough to warrant a follow-up question
+            logger.info("Weather alert not severe enough for follow-up: %s", most_severe.severity)
+            return None
+
+        emoji = get_alert_emoji(most_severe.event)
+        weather_summary = f"{emoji} {most_severe.event}"
+        return build(most_severe, emoji, weather_summary)
 
     except Exception as e:
         logger.error(f"Weather check failed: {e}", exc_info=True)
@@ -8,15 +8,76 @@ Endpoints:
   - GET  https://places.googleapis.com/v1/places/{place_id}
 """
 
+import asyncio
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 from typing import Optional, List
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 
+from app.cache import cache
+from app.utils.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 CACHE_TTL = timedelta(days=7)
+CACHE_TTL_SECONDS = CACHE_TTL.total_seconds()
+CACHE_MAX_ENTRIES = 1024
+SHARED_CACHE_PREFIX = "gplaces:"
+
+SEARCH_URL = "https://places.googleapis.com/v1/places:searchText"
+DETAILS_URL = "https://places.googleapis.com/v1/places/{place_id}"
+
+_SEARCH_FIELD_MASK = "places.id,places.displayName,places.formattedAddress,places.addressComponents,places.location,places.internationalPhoneNumber,places.websiteUri,places.rating,places.userRatingCount,places.types,places.businessStatus"
+_DETAILS_FIELD_MASK = "id,displayName,formattedAddress,addressComponents,location,internationalPhoneNumber,websiteUri,rating,userRatingCount,types,businessStatus"
+
+# Static request headers; only the API key is added per call
+_SEARCH_HEADERS = {
+    "Content-Type": "application/json",
+    "X-Goog-FieldMask": _SEARCH_FIELD_MASK,
+}
+_DETAILS_HEADERS = {
+    "X-Goog-FieldMask": _DETAILS_FIELD_MASK,
+}
+
+# Shared session so calls to places.googleapis.com reuse pooled keep-alive
+# connections instead of paying a TCP+TLS handshake per request
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+    ),
+))
+
+# Async client for callers running on the event loop; created on first use
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _async_client
+
+
+async def close_async_client():
+    """Close the async HTTP client. Call this on application shutdown."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
 
 
 @dataclass
@@ -42,34 +103,67 @@ class GooglePlaceData:
         return asdict(self)
 
 
-# In-memory TTL cache
-_cache: dict[str, tuple[object, datetime]] = {}
+# Per-worker LRU cache with TTL, backed by the shared Redis cache so all
+# workers reuse the same results
+_local_cache = TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS)
 
 
 def _get_cached(key: str):
-    if key in _cache:
-        data, cached_at = _cache[key]
-        if datetime.utcnow() - cached_at < CACHE_TTL:
-            return data
-        del _cache[key]
-    return None
+    data = _local_cache.get(key)
+    if data is not None:
+        return data
+    return _get_shared(key)
+
+
+def _get_shared(key: str):
+    """Look up the shared Redis cache, filling the local cache on a hit."""
+    raw = cache.get_json(SHARED_CACHE_PREFIX + key)
+    if raw is None:
+        return None
+
+    if isinstance(raw, list):
+        data = [GooglePlaceData(**p) for p in raw]
+    else:
+        data = GooglePlaceData(**raw)
+    _local_cache.set(key, data)
+    return data
 
 
 def _set_cache(key: str, data):
-    _cache[key] = (data, datetime.utcnow())
+    _local_cache.set(key, data)
+    _set_shared(key, data)
+
+
+def _set_shared(key: str, data):
+    if isinstance(data, list):
+        payload = [p.to_dict() for p in data]
+    else:
+        payload = data.to_dict()
+    cache.set_json(SHARED_CACHE_PREFIX + key, payload, int(CACHE_TTL_SECONDS))
+
+
+# Address component type -> (result field, prefer shortText)
+_COMPONENT_FIELDS = {
+    "locality": ("city", False),
+    "administrative_area_level_1": ("state", True),
+    "postal_code": ("zip_code", False),
+}
 
 
 def _parse_address_components(components: list) -> dict:
     """Extract city, state, zip from Google address components."""
     result = {"city": None, "state": None, "zip_code": None}
     for comp in components or []:
-        types = comp.get("types", [])
-        if "locality" in types:
-            result["city"] = comp.get("longText") or comp.get("shortText")
-        elif "administrative_area_level_1" in types:
-            result["state"] = comp.get("shortText")
-        elif "postal_code" in types:
-            result["zip_code"] = comp.get("longText") or comp.get("shortText")
+        for comp_type in comp.get("types", ()):
+            target = _COMPONENT_FIELDS.get(comp_type)
+            if target is None:
+                continue
+            field, prefer_short = target
+            if prefer_short:
+                result[field] = comp.get("shortText")
+            else:
+                result[field] = comp.get("longText") or comp.get("shortText")
+            break
     return result
 
 
@@ -97,6 +191,20 @@ def _parse_place(place: dict) -> GooglePlaceData:
     )
 
 
+def _search_cache_key(query: str, location: Optional[str]) -> str:
+    return f"search:{query.lower().strip()}:{location or ''}"
+
+
+def _search_request(query: str, api_key: str, location: Optional[str], limit: int) -> tuple[str, dict, dict]:
+    """Build the (url, headers, body) for a Text Search request."""
+    headers = {**_SEARCH_HEADERS, "X-Goog-Api-Key": api_key}
+    body = {
+        "textQuery": f"{query} {location}" if location else query,
+        "maxResultCount": min(limit, 10),
+    }
+    return SEARCH_URL, headers, body
+
+
 def search_places(query: str, api_key: str, location: Optional[str] = None, limit: int = 5) -> List[GooglePlaceData]:
     """
     Search for places using Google Places Text Search (New) API.
@@ -110,25 +218,15 @@ def search_places(query: str, api_key: str, location: Optional[str] = None, limi
     Returns:
         List of GooglePlaceData results
     """
-    cache_key = f"search:{query.lower().strip()}:{location or ''}"
+    cache_key = _search_cache_key(query, location)
     cached = _get_cached(cache_key)
     if cached is not None:
         return cached
 
     try:
-        url = "https://places.googleapis.com/v1/places:searchText"
-        headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": api_key,
-            "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.addressComponents,places.location,places.internationalPhoneNumber,places.websiteUri,places.rating,places.userRatingCount,places.types,places.businessStatus",
-        }
-
-        body = {
-            "textQuery": f"{query} {location}" if location else query,
-            "maxResultCount": min(limit, 10),
-        }
+        url, headers, body = _search_request(query, api_key, location, limit)
 
-        response = requests.post(url, json=body, headers=headers, timeout=10)
+        response = _session.post(url, json=body, headers=headers, timeout=10)
 
         if response.status_code != 200:
             logger.warning(f"Google Places API returned {response.status_code}: {response.text[:200]}")
@@ -152,6 +250,50 @@ def search_places(query: str, api_key: str, location: Optional[str] = None, limi
         return []
 
 
+async def search_places_async(query: str, api_key: str, location: Optional[str] = None, limit: int = 5) -> List[GooglePlaceData]:
+    """
+    Async variant of search_places for use from async endpoints.
+
+    Does not block the event loop while waiting on Google, so several
+    searches can run concurrently with asyncio.gather. Shares the cache
+    with search_places; Redis calls run in a worker thread since the
+    client is blocking.
+    """
+    cache_key = _search_cache_key(query, location)
+    cached = _local_cache.get(cache_key)
+    if cached is None:
+        cached = await asyncio.to_thread(_get_shared, cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        url, headers, body = _search_request(query, api_key, location, limit)
+
+        response = await _get_async_client().post(url, json=body, headers=headers)
+
+        if response.status_code != 200:
+            logger.warning(f"Google Places API returned {response.status_code}: {response.text[:200]}")
+            return []
+
+        data = response.json()
+        places = data.get("places", [])
+
+        results = [_parse_place(p) for p in places[:limit]]
+        _local_cache.set(cache_key, results)
+        await asyncio.to_thread(_set_shared, cache_key, results)
+        return results
+
+    except httpx.TimeoutException:
+        logger.warning("Google Places API timeout")
+        return []
+    except httpx.HTTPError as e:
+        logger.error(f"Google Places API request error: {e}")
+        return []
+    except Exception as e:
+        logger.error(f"Google Places API error: {e}", exc_info=True)
+        return []
+
+
 def get_place_details(place_id: str, api_key: str) -> Optional[GooglePlaceData]:
     """
     Get detailed info for a specific place by ID.
@@ -162,13 +304,10 @@ def get_place_details(place_id: str, api_key: str) -> Optional[GooglePlaceData]:
         return cached
 
     try:
-        url = f"https://places.googleapis.com/v1/places/{place_id}"
-        headers = {
-            "X-Goog-Api-Key": api_key,
-            "X-Goog-FieldMask": "id,displayName,formattedAddress,addressComponents,location,internationalPhoneNumber,websiteUri,rating,userRatingCount,types,businessStatus",
-        }
+        url = DETAILS_URL.format(place_id=place_id)
+        headers = {**_DETAILS_HEADERS, "X-Goog-Api-Key": api_key}
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = _session.get(url, headers=headers, timeout=10)
 
         if response.status_code != 200:
             logger.warning(f"Google Places Details API returned {response.status_code}")
@@ -4,16 +4,59 @@ Estimates total career miles based on years of experience and haul type.
 Uses industry averages per ATA Trucking Association data.
 """
 
-ANNUAL_MILES_BY_HAUL_TYPE = {
-    "long_haul": 125000,
-    "otr": 130000,
-    "regional": 80000,
-    "local": 50000,
-    "dedicated": 100000,
-}
+from enum import IntEnum
+from typing import Optional
+
+
+class HaulType(IntEnum):
+    """Haul types as integer ids, used to index ANNUAL_MILES."""
+    LONG_HAUL = 0
+    OTR = 1
+    REGIONAL = 2
+    LOCAL = 3
+    DEDICATED = 4
+    UNKNOWN = 5
+
 
 DEFAULT_ANNUAL_MILES = 100000
 
+# Annual miles indexed by HaulType
+ANNUAL_MILES = (
+    125000,  # LONG_HAUL
+    130000,  # OTR
+    80000,  # REGIONAL
+    50000,  # LOCAL
+    100000,  # DEDICATED
+    DEFAULT_ANNUAL_MILES,  # UNKNOWN
+)
+
+HAUL_TYPE_IDS = {
+    "long_haul": HaulType.LONG_HAUL,
+    "otr": HaulType.OTR,
+    "regional": HaulType.REGIONAL,
+    "local": HaulType.LOCAL,
+    "dedicated": HaulType.DEDICATED,
+}
+
+
+def get_haul_type_id(haul_type: Optional[str]) -> HaulType:
+    """Map a haul_type string (as stored in the DB) to its HaulType id."""
+    return HAUL_TYPE_IDS.get(haul_type, HaulType.UNKNOWN)
+
+
+def calculate_estimated_miles_by_id(years: int, haul_type_id: int) -> int:
+    """
+    Calculate estimated career miles for a pre-resolved HaulType id.
+
+    Args:
+        years: Number of years of driving experience.
+        haul_type_id: HaulType value.
+
+    Returns:
+        Estimated total career miles.
+    """
+    return ANNUAL_MILES[haul_type_id] * (years if years > 0 else 0)
+
 
 def calculate_estimated_miles(years: int, haul_type: str = None) -> int:
     """
@@ -26,8 +69,11 @@ def calculate_estimated_miles(years: int, haul_type: str = None) -> int:
     Returns:
         Estimated total career miles.
     """
-    annual = ANNUAL_MILES_BY_HAUL_TYPE.get(haul_type, DEFAULT_ANNUAL_MILES) if haul_type else DEFAULT_ANNUAL_MILES
-    return annual * max(years, 0)
+    return calculate_estimated_miles_by_id(years, get_haul_type_id(haul_type))
+
+
+# (divisor, suffix, decimals), indexed by whether miles >= 1M
+_MILES_MAGNITUDES = ((1_000, "K", 0), (1_000_000, "M", 1))
 
 
 def format_miles_display(miles: int) -> str:
@@ -40,8 +86,7 @@ def format_miles_display(miles: int) -> str:
     Returns:
         Formatted string (e.g., "1.3M miles", "125K miles", "500 miles").
     """
-    if miles >= 1_000_000:
-        return f"{miles / 1_000_000:.1f}M miles"
-    elif miles >= 1_000:
-        return f"{miles / 1_000:.0f}K miles"
-    return f"{miles} miles"
+    if miles < 1_000:
+        return f"{miles} miles"
+    divisor, suffix, precision = _MILES_MAGNITUDES[miles >= 1_000_000]
+    return f"{miles / divisor:.{precision}f}{suffix} miles"
@@ -4,6 +4,8 @@ Profile Completion Calculator
 Also handles badge awarding logic.
 """
 
+import json
+
 # Tier 1: Essential (60% weight) - 6 fields
 TIER_1_FIELDS = ["years_experience", "haul_type", "equipment_type", "cdl_class", "cdl_state", "bio"]
 TIER_1_WEIGHT = 0.6
@@ -16,16 +18,31 @@ TIER_2_WEIGHT = 0.25
 TIER_3_FIELDS = ["mc_number", "dot_number", "preferred_haul"]
 TIER_3_WEIGHT = 0.15
 
+# (field, tier index) for every scored field, so completion is one pass
+_SCORED_FIELDS = (
+    tuple((f, 0) for f in TIER_1_FIELDS)
+    + tuple((f, 1) for f in TIER_2_FIELDS)
+    + tuple((f, 2) for f in TIER_3_FIELDS)
+)
+# (field count, weight) per tier index
+_TIERS = (
+    (len(TIER_1_FIELDS), TIER_1_WEIGHT),
+    (len(TIER_2_FIELDS), TIER_2_WEIGHT),
+    (len(TIER_3_FIELDS), TIER_3_WEIGHT),
+)
+
 
 def _field_filled(profile: dict, field: str) -> bool:
     """Check if a profile field has a meaningful value."""
     val = profile.get(field)
     if val is None:
         return False
-    if isinstance(val, str) and not val.strip():
-        return False
-    if isinstance(val, list) and len(val) == 0:
-        return False
+    # Exact type checks: profile rows are decoded JSON, so never subclasses
+    t = type(val)
+    if t is str:
+        return bool(val) and not val.isspace()
+    if t is list:
+        return bool(val)
     return True
 
 
@@ -46,19 +63,62 @@ def calculate_completion(profile: dict) -> int:
     if not profile:
         return 0
 
-    tier1_count = sum(1 for f in TIER_1_FIELDS if _field_filled(profile, f))
-    tier2_count = sum(1 for f in TIER_2_FIELDS if _field_filled(profile, f))
-    tier3_count = sum(1 for f in TIER_3_FIELDS if _field_filled(profile, f))
-
-    tier1_pct = (tier1_count / len(TIER_1_FIELDS)) * TIER_1_WEIGHT
-    tier2_pct = (tier2_count / len(TIER_2_FIELDS)) * TIER_2_WEIGHT
-    tier3_pct = (tier3_count / len(TIER_3_FIELDS)) * TIER_3_WEIGHT
+    counts = [0, 0, 0]
+    for field, tier in _SCORED_FIELDS:
+        if _field_filled(profile, field):
+            counts[tier] += 1
 
-    total = tier1_pct + tier2_pct + tier3_pct
+    total = sum((count / size) * weight for count, (size, weight) in zip(counts, _TIERS))
     return min(round(total * 100), 100)
 
 
-def check_badges(profile: dict, existing_badges: list = None) -> list:
+# (badge id, display name, award rule), checked in order.
+# Rules take the context dict built by check_badges.
+_BADGE_RULES = (
+    # Completion badges
+    ("profile_starter", "Profile Starter", lambda ctx: ctx["completion"] >= 25),
+    ("halfway_there", "Halfway There", lambda ctx: ctx["completion"] >= 50),
+    ("almost_complete", "Almost Complete", lambda ctx: ctx["completion"] >= 75),
+    ("profile_complete", "Profile Complete", lambda ctx: ctx["completion"] >= 100),
+    # Experience badges
+    ("one_year_veteran", "1 Year Veteran", lambda ctx: ctx["years"] >= 1),
+    ("five_year_veteran", "5 Year Veteran", lambda ctx: ctx["years"] >= 5),
+    ("decade_driver", "Decade Driver", lambda ctx: ctx["years"] >= 10),
+    ("road_legend", "Road Legend", lambda ctx: ctx["years"] >= 20),
+    # Million miler
+    ("million_miler", "Million Miler", lambda ctx: ctx["miles"] >= 1_000_000),
+    # Open to work
+    ("open_to_work", "Open to Work", lambda ctx: ctx["open_to_work"]),
+    # Verification badges (from role_details)
+    ("fmcsa_verified", "FMCSA Verified", lambda ctx: ctx["role_details"].get("fmcsa_verified")),
+    ("google_verified", "Google Verified", lambda ctx: ctx["role_details"].get("google_verified")),
+)
+
+# Every badge check_badges can award
+_ALL_BADGE_IDS = frozenset(badge_id for badge_id, _, _ in _BADGE_RULES)
+
+# Badge dict per id; check_badges hands out copies since callers may set awarded_at
+_BADGE_TEMPLATES = {
+    badge_id: {"id": badge_id, "name": name, "awarded_at": None}
+    for badge_id, name, _ in _BADGE_RULES
+}
+
+# Badges whose rules read role_details
+_VERIFICATION_BADGE_IDS = frozenset({"fmcsa_verified", "google_verified"})
+
+
+def _load_role_details(profile: dict) -> dict:
+    """Get role_details from a profile (stored as a JSON string or dict)."""
+    role_details = profile.get("role_details", {})
+    if isinstance(role_details, str):
+        try:
+            role_details = json.loads(role_details)
+        except (json.JSONDecodeError, TypeError):
+            role_details = {}
+    return role_details
+
+
+def check_badges(profile: dict, existing_badges: list = None, completion: int = None) -> list:
     """
     Check and award badges based on profile data.
 
@@ -71,6 +131,7 @@ def check_badges(profile: dict, existing_badges: list = None) -> list:
     Args:
         profile: Dictionary of profile field values.
         existing_badges: List of already-awarded badge dicts.
+        completion: Completion percentage if the caller already computed it.
 
     Returns:
         Updated list of badge dicts (existing + newly awarded).
@@ -81,54 +142,29 @@ def check_badges(profile: dict, existing_badges: list = None) -> list:
     badge_ids = {b.get("id") for b in existing_badges}
     new_badges = list(existing_badges)
 
-    completion = calculate_completion(profile)
-
-    # Completion badges
-    if completion >= 25 and "profile_starter" not in badge_ids:
-        new_badges.append({"id": "profile_starter", "name": "Profile Starter", "awarded_at": None})
-
-    if completion >= 50 and "halfway_there" not in badge_ids:
-        new_badges.append({"id": "halfway_there", "name": "Halfway There", "awarded_at": None})
-
-    if completion >= 75 and "almost_complete" not in badge_ids:
-        new_badges.append({"id": "almost_complete", "name": "Almost Complete", "awarded_at": None})
-
-    if completion >= 100 and "profile_complete" not in badge_ids:
-        new_badges.append({"id": "profile_complete", "name": "Profile Complete", "awarded_at": None})
-
-    # Experience badges
-    years = profile.get("years_experience", 0) or 0
-    if years >= 1 and "one_year_veteran" not in badge_ids:
-        new_badges.append({"id": "one_year_veteran", "name": "1 Year Veteran", "awarded_at": None})
-    if years >= 5 and "five_year_veteran" not in badge_ids:
-        new_badges.append({"id": "five_year_veteran", "name": "5 Year Veteran", "awarded_at": None})
-    if years >= 10 and "decade_driver" not in badge_ids:
-        new_badges.append({"id": "decade_driver", "name": "Decade Driver", "awarded_at": None})
-    if years >= 20 and "road_legend" not in badge_ids:
-        new_badges.append({"id": "road_legend", "name": "Road Legend", "awarded_at": None})
-
-    # Million miler
-    miles = profile.get("estimated_miles", 0) or 0
-    if miles >= 1_000_000 and "million_miler" not in badge_ids:
-        new_badges.append({"id": "million_miler", "name": "Million Miler", "awarded_at": None})
-
-    # Open to work
-    if profile.get("open_to_work") and "open_to_work" not in badge_ids:
-        new_badges.append({"id": "open_to_work", "name": "Open to Work", "awarded_at": None})
-
-    # Verification badges (from role_details)
-    role_details = profile.get("role_details", {})
-    if isinstance(role_details, str):
-        import json
-        try:
-            role_details = json.loads(role_details)
-        except (json.JSONDecodeError, TypeError):
-            role_details = {}
-
-    if role_details.get("fmcsa_verified") and "fmcsa_verified" not in badge_ids:
-        new_badges.append({"id": "fmcsa_verified", "name": "FMCSA Verified", "awarded_at": None})
-
-    if role_details.get("google_verified") and "google_verified" not in badge_ids:
-        new_badges.append({"id": "google_verified", "name": "Google Verified", "awarded_at": None})
+    # Nothing left to award
+    if _ALL_BADGE_IDS <= badge_ids:
+        return new_badges
+
+    if completion is None:
+        completion = calculate_completion(profile)
+
+    # Only parse role_details if a verification badge can still be awarded
+    if _VERIFICATION_BADGE_IDS - badge_ids:
+        role_details = _load_role_details(profile)
+    else:
+        role_details = {}
+
+    ctx = {
+        "completion": completion,
+        "years": profile.get("years_experience", 0) or 0,
+        "miles": profile.get("estimated_miles", 0) or 0,
+        "open_to_work": profile.get("open_to_work"),
+        "role_details": role_details,
+    }
+
+    for badge_id, _, rule in _BADGE_RULES:
+        if badge_id not in badge_ids and rule(ctx):
+            new_badges.append(_BADGE_TEMPLATES[badge_id].copy())
 
     return new_badges
@@ -4,19 +4,60 @@ Integrates with National Weather Service API for real-time weather alerts
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
+import socket
+try:
+    import orjson  # Faster decoding of NWS responses, if installed
+except ImportError:
+    orjson = None
 from typing import Optional, List
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from dataclasses import dataclass, asdict
+
+from app.cache import cache
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
-WEATHER_API_BASE = "https://api.weather.gov"
+WEATHER_API_HOST = "api.weather.gov"
+WEATHER_API_BASE = f"https://{WEATHER_API_HOST}"
 USER_AGENT = "FindTruckDriver/1.0 (contact@findtruckdriver.com)"
 CACHE_DURATION_MINUTES = 15
+CACHE_MAX_ENTRIES = 10000  # LRU bound per worker
+SHARED_CACHE_PREFIX = "nws:alerts:"
+FAILURE_CACHE_SECONDS = 60
+NWS_TIMEOUT = (2, 5)  # (connect, read) seconds
+
+# Shared session for all api.weather.gov calls (also used by weather_stats).
+# Keep-alive connections are reused, so multi-step lookups pay one TLS
+# handshake instead of one per request.
+nws_session = requests.Session()
+nws_session.headers.update({"User-Agent": USER_AGENT})
+nws_session.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+))
+
+
+def warm_dns():
+    """
+    Resolve api.weather.gov once so the first weather request after a cold
+    start doesn't pay the DNS lookup. Failures are ignored.
+    """
+    try:
+        socket.getaddrinfo(WEATHER_API_HOST, 443, type=socket.SOCK_STREAM)
+    except OSError as e:
+        logger.warning(f"Could not pre-resolve {WEATHER_API_HOST}: {e}")
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WeatherAlert:
     """Weather alert from NWS"""
     event: str  # e.g., "Winter Storm Warning"
@@ -30,8 +71,29 @@ class WeatherAlert:
     expires: Optional[str]  # ISO timestamp when alert expires
 
 
-# Simple in-memory cache (in production, use Redis)
-_weather_cache = {}
+# Per-worker cache, bounded and shared between threads. Concurrent misses for
+# the same location wait on one lookup instead of each issuing their own.
+# Misses fall through to the shared Redis cache before calling NWS.
+_weather_cache = TTLCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttl_seconds=CACHE_DURATION_MINUTES * 60
+)
+
+# Locations whose last lookup failed. During an NWS outage each location is
+# retried at most once per FAILURE_CACHE_SECONDS instead of on every request.
+_failed_lookups = TTLCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttl_seconds=FAILURE_CACHE_SECONDS
+)
+
+
+def _cache_key(latitude: float, longitude: float) -> str:
+    """
+    Cache key bucketed to 2 decimals (~1 km). NWS grid cells are ~2.5 km,
+    so drivers a few blocks apart share one lookup; the request itself
+    still uses the caller's full-precision location.
+    """
+    return f"{latitude:.2f},{longitude:.2f}"
 
 
 def get_weather_alerts(latitude: float, longitude: float) -> List[WeatherAlert]:
@@ -39,7 +101,8 @@ def get_weather_alerts(latitude: float, longitude: float) -> List[WeatherAlert]:
     Get active weather alerts for a location.
 
     Uses National Weather Service API (free, no API key required).
-    Results are cached for 15 minutes to reduce API calls.
+    Results are cached for 15 minutes to reduce API calls. Nearby locations
+    (within ~1 km) share one cache entry.
 
     Args:
         latitude: Location latitude
@@ -48,39 +111,69 @@ def get_weather_alerts(latitude: float, longitude: float) -> List[WeatherAlert]:
     Returns:
         List of active weather alerts
     """
-    # Check cache first
-    cache_key = f"{latitude:.4f},{longitude:.4f}"
-    if cache_key in _weather_cache:
-        cached_time, cached_alerts = _weather_cache[cache_key]
-        if datetime.utcnow() - cached_time < timedelta(minutes=CACHE_DURATION_MINUTES):
-            logger.debug(f"Weather alerts cache hit for {cache_key}")
-            return cached_alerts
+    cache_key = _cache_key(latitude, longitude)
+
+    if _failed_lookups.get(cache_key):
+        logger.debug(f"Weather alerts lookup recently failed for {cache_key}, skipping")
+        return []
+
+    try:
+        alerts = _weather_cache.get_or_load(
+            cache_key,
+            lambda: _load_weather_alerts(cache_key, latitude, longitude)
+        )
+    except Exception as e:
+        logger.error(f"Weather API error: {e}", exc_info=True)
+        alerts = None
+
+    if alerts is None:
+        _failed_lookups.set(cache_key, True)
+        return []
+
+    return alerts
+
+
+def _load_weather_alerts(cache_key: str, latitude: float, longitude: float) -> Optional[List[WeatherAlert]]:
+    """Load alerts from the shared cache, falling back to NWS."""
+    shared_key = SHARED_CACHE_PREFIX + cache_key
+
+    cached = cache.get_json(shared_key)
+    if cached is not None:
+        return [WeatherAlert(**a) for a in cached]
+
+    alerts = _fetch_weather_alerts(latitude, longitude)
+    if alerts is not None:
+        cache.set_json(shared_key, [asdict(a) for a in alerts], CACHE_DURATION_MINUTES * 60)
+    return alerts
+
+
+def _fetch_weather_alerts(latitude: float, longitude: float) -> Optional[List[WeatherAlert]]:
+    """
+    Fetch active weather alerts from NWS.
 
+    Returns None on failure so the result is not cached.
+    """
     try:
         # Step 1: Get grid point for location
         point_url = f"{WEATHER_API_BASE}/points/{latitude:.4f},{longitude:.4f}"
         logger.debug(f"Fetching weather grid point: {point_url}")
 
-        point_response = requests.get(
-            point_url,
-            headers={"User-Agent": USER_AGENT},
-            timeout=5
-        )
+        point_response = nws_session.get(point_url, timeout=NWS_TIMEOUT)
 
         if point_response.status_code != 200:
             logger.warning(
                 f"Weather API point lookup failed: {point_response.status_code} "
                 f"for {latitude}, {longitude}"
             )
-            return []
+            return None
 
-        point_data = point_response.json()
+        point_data = orjson.loads(point_response.content) if orjson else point_response.json()
 
         # Extract forecast zone URL
         zone_url = point_data.get("properties", {}).get("forecastZone")
         if not zone_url:
             logger.warning("No forecast zone in weather API response")
-            return []
+            return None
 
         # Get zone ID from URL (e.g., "WYZ106" from ".../zones/forecast/WYZ106")
         zone_id = zone_url.split("/")[-1]
@@ -89,17 +182,13 @@ def get_weather_alerts(latitude: float, longitude: float) -> List[WeatherAlert]:
         alerts_url = f"{WEATHER_API_BASE}/alerts/active/zone/{zone_id}"
         logger.debug(f"Fetching weather alerts: {alerts_url}")
 
-        alerts_response = requests.get(
-            alerts_url,
-            headers={"User-Agent": USER_AGENT},
-            timeout=5
-        )
+        alerts_response = nws_session.get(alerts_url, timeout=NWS_TIMEOUT)
 
         if alerts_response.status_code != 200:
             logger.warning(f"Weather API alerts lookup failed: {alerts_response.status_code}")
-            return []
+            return None
 
-        alerts_data = alerts_response.json()
+        alerts_data = orjson.loads(alerts_response.content) if orjson else alerts_response.json()
 
         # Parse alerts
         alerts = []
@@ -120,20 +209,17 @@ def get_weather_alerts(latitude: float, longitude: float) -> List[WeatherAlert]:
 
         logger.info(f"Found {len(alerts)} weather alerts for zone {zone_id}")
 
-        # Cache the results
-        _weather_cache[cache_key] = (datetime.utcnow(), alerts)
-
         return alerts
 
     except requests.Timeout:
         logger.warning(f"Weather API timeout for {latitude}, {longitude}")
-        return []
+        return None
     except requests.RequestException as e:
         logger.error(f"Weather API request error: {e}")
-        return []
+        return None
     except Exception as e:
         logger.error(f"Weather API error: {e}", exc_info=True)
-        return []
+        return None
 
 
 def has_severe_alerts(alerts: List[WeatherAlert]) -> bool:
@@ -168,6 +254,15 @@ def has_immediate_alerts(alerts: List[WeatherAlert]) -> bool:
     )
 
 
+_SEVERITY_ORDER = {"Extreme": 4, "Severe": 3, "Moderate": 2, "Minor": 1, "Unknown": 0}
+_URGENCY_ORDER = {"Immediate": 3, "Expected": 2, "Future": 1, "Unknown": 0}
+
+
+def _alert_rank(alert: WeatherAlert) -> int:
+    """Severity then urgency, packed into one int (urgency fits in the low 4 bits)."""
+    return (_SEVERITY_ORDER.get(alert.severity, 0) << 4) | _URGENCY_ORDER.get(alert.urgency, 0)
+
+
 def get_most_severe_alert(alerts: List[WeatherAlert]) -> Optional[WeatherAlert]:
     """
     Get the most severe alert from a list.
@@ -185,16 +280,25 @@ def get_most_severe_alert(alerts: List[WeatherAlert]) -> Optional[WeatherAlert]:
     if not alerts:
         return None
 
-    severity_order = {"Extreme": 4, "Severe": 3, "Moderate": 2, "Minor": 1, "Unknown": 0}
-    urgency_order = {"Immediate": 3, "Expected": 2, "Future": 1, "Unknown": 0}
+    return max(alerts, key=_alert_rank)
 
-    return max(
-        alerts,
-        key=lambda a: (
-            severity_order.get(a.severity, 0),
-            urgency_order.get(a.urgency, 0)
-        )
-    )
+
+# (keyword, emoji) in priority order - first keyword found in the event wins
+_ALERT_EMOJI_KEYWORDS = (
+    ("tornado", "🌪️"),
+    ("thunder", "⛈️"),
+    ("lightning", "⛈️"),
+    ("snow", "❄️"),
+    ("blizzard", "❄️"),
+    ("ice", "🧊"),
+    ("freezing", "🧊"),
+    ("flood", "🌊"),
+    ("wind", "💨"),
+    ("heat", "🔥"),
+    ("fog", "🌫️"),
+    ("rain", "🌧️"),
+    ("hurricane", "🌀"),
+)
 
 
 def get_alert_emoji(event: str) -> str:
@@ -209,28 +313,10 @@ def get_alert_emoji(event: str) -> str:
     """
     event_lower = event.lower()
 
-    if "tornado" in event_lower:
-        return "🌪️"
-    elif "thunder" in event_lower or "lightning" in event_lower:
-        return "⛈️"
-    elif "snow" in event_lower or "blizzard" in event_lower:
-        return "❄️"
-    elif "ice" in event_lower or "freezing" in event_lower:
-        return "🧊"
-    elif "flood" in event_lower:
-        return "🌊"
-    elif "wind" in event_lower:
-        return "💨"
-    elif "heat" in event_lower:
-        return "🔥"
-    elif "fog" in event_lower:
-        return "🌫️"
-    elif "rain" in event_lower:
-        return "🌧️"
-    elif "hurricane" in event_lower:
-        return "🌀"
-    else:
-        return "⚠️"
+    for keyword, emoji in _ALERT_EMOJI_KEYWORDS:
+        if keyword in event_lower:
+            return emoji
+    return "⚠️"
 
 
 def should_warn_driver(alerts: List[WeatherAlert], driver_status: str) -> bool:
@@ -258,6 +344,49 @@ def should_warn_driver(alerts: List[WeatherAlert], driver_status: str) -> bool:
     return False
 
 
+@dataclass(slots=True)
+class AlertSummary:
+    """What the alert checks above report, gathered in one pass"""
+    has_severe: bool = False
+    has_immediate: bool = False
+    most_severe: Optional[WeatherAlert] = None
+
+    def should_warn(self, driver_status: str) -> bool:
+        """Same rule as should_warn_driver."""
+        return self.has_severe or (driver_status == "rolling" and self.has_immediate)
+
+
+def summarize_alerts(alerts: List[WeatherAlert]) -> AlertSummary:
+    """
+    Check severity, urgency and the most severe alert in a single scan.
+
+    Use this instead of calling has_severe_alerts, get_most_severe_alert and
+    should_warn_driver separately on the same list.
+
+    Args:
+        alerts: List of weather alerts
+
+    Returns:
+        AlertSummary (all False/None for an empty list)
+    """
+    summary = AlertSummary()
+    best_rank = -1
+
+    for alert in alerts:
+        if alert.severity in ("Severe", "Extreme"):
+            summary.has_severe = True
+        if alert.urgency == "Immediate":
+            summary.has_immediate = True
+
+        # Strictly greater keeps the first of equal ranks, like max()
+        rank = _alert_rank(alert)
+        if rank > best_rank:
+            best_rank = rank
+            summary.most_severe = alert
+
+    return summary
+
+
 def get_weather_summary(alerts: List[WeatherAlert]) -> Optional[str]:
     """
     Get a brief summary of weather conditions.
@@ -4,19 +4,29 @@ Provides current weather conditions for display in global stats
 """
 
 import requests
+import httpx
 import logging
-from typing import Optional, Dict
-from datetime import datetime, timedelta
+import math
+from typing import Optional, Dict, Tuple
 from dataclasses import dataclass
 
+from app.services.weather_api import WEATHER_API_BASE, USER_AGENT, NWS_TIMEOUT, nws_session
+from app.utils.location import calculate_distance
+from app.utils.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
-WEATHER_API_BASE = "https://api.weather.gov"
-USER_AGENT = "FindTruckDriver/1.0 (contact@findtruckdriver.com)"
 CACHE_DURATION_MINUTES = 30  # Longer cache for current conditions
+CACHE_MAX_ENTRIES = 10000  # LRU bound per worker
+STATION_CACHE_HOURS = 24
+FAILURE_CACHE_SECONDS = 60
+
+# Whole-degree Celsius -> Fahrenheit for every temperature NWS realistically
+# reports; anything outside the table falls back to the formula
+_C_TO_F = {c: int((c * 9/5) + 32) for c in range(-60, 61)}
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WeatherConditions:
     """Current weather conditions"""
     temperature_f: int  # Fahrenheit
@@ -30,8 +40,67 @@ class WeatherConditions:
     humidity_percent: Optional[int] = None
 
 
-# Simple in-memory cache
-_conditions_cache = {}
+# In-memory cache, bounded and shared between threads. Concurrent misses for
+# the same location wait on one NWS request instead of each issuing their own.
+_conditions_cache = TTLCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttl_seconds=CACHE_DURATION_MINUTES * 60
+)
+
+# Grid point metadata (stations URL + city/state) per location, so
+# label-only lookups and station lookups share one /points request
+_point_cache = TTLCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttl_seconds=STATION_CACHE_HOURS * 3600
+)
+
+# Nearest observation station + city/state per location. Stations don't
+# move, so after the first lookup only the observation request is made.
+_station_cache = TTLCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttl_seconds=STATION_CACHE_HOURS * 3600
+)
+
+
+# Locations whose last lookup failed, retried at most once per
+# FAILURE_CACHE_SECONDS during an NWS outage
+_failed_lookups = TTLCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttl_seconds=FAILURE_CACHE_SECONDS
+)
+
+
+# Async client for callers running on the event loop; created on first use
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(NWS_TIMEOUT[1], connect=NWS_TIMEOUT[0]),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            follow_redirects=True,
+        )
+    return _async_client
+
+
+async def close_async_client():
+    """Close the async HTTP client. Call this on application shutdown."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _cache_key(latitude: float, longitude: float) -> str:
+    """
+    Cache key bucketed to 2 decimals (~1 km). NWS grid cells are ~2.5 km,
+    so nearby drivers share one lookup; the request itself still uses the
+    caller's full-precision location.
+    """
+    return f"{latitude:.2f},{longitude:.2f}"
 
 
 def get_current_conditions(latitude: float, longitude: float) -> Optional[WeatherConditions]:
@@ -39,7 +108,8 @@ def get_current_conditions(latitude: float, longitude: float) -> Optional[Weathe
     Get current weather conditions for a location.
 
     Uses National Weather Service API (free, no API key required).
-    Results are cached for 30 minutes.
+    Results are cached for 30 minutes. Nearby locations (within ~1 km)
+    share one cache entry.
 
     Args:
         latitude: Location latitude
@@ -48,146 +118,355 @@ def get_current_conditions(latitude: float, longitude: float) -> Optional[Weathe
     Returns:
         WeatherConditions object, or None if unavailable
     """
-    # Check cache first
-    cache_key = f"{latitude:.4f},{longitude:.4f}"
-    if cache_key in _conditions_cache:
-        cached_time, cached_conditions = _conditions_cache[cache_key]
-        if datetime.utcnow() - cached_time < timedelta(minutes=CACHE_DURATION_MINUTES):
-            logger.debug(f"Weather conditions cache hit for {cache_key}")
-            return cached_conditions
+    cache_key = _cache_key(latitude, longitude)
 
-    try:
-        # Step 1: Get grid point for location
-        point_url = f"{WEATHER_API_BASE}/points/{latitude:.4f},{longitude:.4f}"
-        logger.debug(f"Fetching weather grid point: {point_url}")
+    if _failed_lookups.get(cache_key):
+        logger.debug(f"Weather conditions lookup recently failed for {cache_key}, skipping")
+        return None
 
-        point_response = requests.get(
-            point_url,
-            headers={"User-Agent": USER_AGENT},
-            timeout=5
+    try:
+        conditions = _conditions_cache.get_or_load(
+            cache_key,
+            lambda: _fetch_current_conditions(latitude, longitude)
         )
+    except Exception as e:
+        logger.error(f"Weather API error: {e}", exc_info=True)
+        conditions = None
 
-        if point_response.status_code != 200:
-            logger.warning(
-                f"Weather API point lookup failed: {point_response.status_code} "
-                f"for {latitude}, {longitude}"
-            )
-            return None
+    if conditions is None:
+        _failed_lookups.set(cache_key, True)
 
-        point_data = point_response.json()
-        properties = point_data.get("properties", {})
+    return conditions
 
-        # Extract observation station URL
-        observation_stations_url = properties.get("observationStations")
-        if not observation_stations_url:
-            logger.warning("No observation stations in weather API response")
-            return None
 
-        # Get city and state from the point data
-        relative_location = properties.get("relativeLocation", {}).get("properties", {})
-        raw_city = relative_location.get("city", "Unknown")
-        state = relative_location.get("state", "")
+def _parse_point(data: dict, latitude: float, longitude: float) -> Optional[Tuple[str, str, str]]:
+    """
+    Pull the observation stations URL and city/state out of a /points response.
 
-        # Map small towns to their major metro area for better recognition
-        # This helps users recognize where they are (e.g., "Fresno" vs "Biola")
-        city = map_to_major_city(raw_city, state, latitude, longitude)
+    Returns:
+        (observation_stations_url, city, state), or None if stations are missing
+    """
+    properties = data.get("properties", {})
 
-        # Step 2: Get nearest observation station
-        stations_response = requests.get(
-            observation_stations_url,
-            headers={"User-Agent": USER_AGENT},
-            timeout=5
+    # Extract observation station URL
+    observation_stations_url = properties.get("observationStations")
+    if not observation_stations_url:
+        logger.warning("No observation stations in weather API response")
+        return None
+
+    # Get city and state from the point data
+    relative_location = properties.get("relativeLocation", {}).get("properties", {})
+    raw_city = relative_location.get("city", "Unknown")
+    state = relative_location.get("state", "")
+
+    # Map small towns to their major metro area for better recognition
+    # This helps users recognize where they are (e.g., "Fresno" vs "Biola")
+    city = map_to_major_city(raw_city, state, latitude, longitude)
+
+    return observation_stations_url, city, state
+
+
+def _parse_nearest_station(data: dict) -> Optional[str]:
+    """Get the first (nearest) station URL from a stations response."""
+    features = data.get("features", [])
+
+    if not features:
+        logger.warning("No observation stations found")
+        return None
+
+    return features[0].get("id")
+
+
+def _fetch_point_metadata(latitude: float, longitude: float) -> Optional[Tuple[str, str, str]]:
+    """
+    Fetch the NWS grid point for a location.
+
+    Returns:
+        (observation_stations_url, city, state), or None on failure (not cached)
+    """
+    point_url = f"{WEATHER_API_BASE}/points/{latitude:.4f},{longitude:.4f}"
+    logger.debug(f"Fetching weather grid point: {point_url}")
+
+    point_response = nws_session.get(point_url, timeout=NWS_TIMEOUT)
+
+    if point_response.status_code != 200:
+        logger.warning(
+            f"Weather API point lookup failed: {point_response.status_code} "
+            f"for {latitude}, {longitude}"
         )
+        return None
 
-        if stations_response.status_code != 200:
-            logger.warning(f"Weather API stations lookup failed: {stations_response.status_code}")
-            return None
+    return _parse_point(point_response.json(), latitude, longitude)
+
+
+def _get_point_metadata(latitude: float, longitude: float) -> Optional[Tuple[str, str, str]]:
+    """Cached grid point lookup: (observation_stations_url, city, state) or None."""
+    return _point_cache.get_or_load(
+        _cache_key(latitude, longitude),
+        lambda: _fetch_point_metadata(latitude, longitude)
+    )
+
+
+def get_location_label(latitude: float, longitude: float) -> Optional[str]:
+    """
+    Get a display label like "Fresno, CA" for a location.
+
+    Only needs the grid point lookup, so it skips the station and
+    observation requests that get_current_conditions makes.
+
+    Args:
+        latitude: Location latitude
+        longitude: Location longitude
+
+    Returns:
+        "City, ST" label, or None if unavailable
+    """
+    try:
+        point = _get_point_metadata(latitude, longitude)
+    except requests.RequestException as e:
+        logger.error(f"Weather API request error: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Weather API error: {e}", exc_info=True)
+        return None
+
+    if point is None:
+        return None
+
+    _, city, state = point
+    return f"{get_metro_name(latitude, longitude, city)}, {state}"
+
+
+def _fetch_station(latitude: float, longitude: float) -> Optional[Tuple[str, str, str]]:
+    """
+    Look up the nearest observation station and the city/state for a location.
+
+    Returns:
+        (station_url, city, state), or None on failure (not cached)
+    """
+    # Step 1: Get grid point for location
+    point = _get_point_metadata(latitude, longitude)
+    if point is None:
+        return None
+
+    observation_stations_url, city, state = point
+
+    # Step 2: Get nearest observation station
+    stations_response = nws_session.get(observation_stations_url, timeout=NWS_TIMEOUT)
+
+    if stations_response.status_code != 200:
+        logger.warning(f"Weather API stations lookup failed: {stations_response.status_code}")
+        return None
+
+    station_url = _parse_nearest_station(stations_response.json())
+    if station_url is None:
+        return None
 
-        stations_data = stations_response.json()
-        features = stations_data.get("features", [])
+    return station_url, city, state
 
-        if not features:
-            logger.warning("No observation stations found")
+
+def _parse_observation(
+    data: dict,
+    latitude: float,
+    longitude: float,
+    city: str,
+    state: str
+) -> Optional[WeatherConditions]:
+    """Build WeatherConditions from a latest-observation response."""
+    obs_props = data.get("properties", {})
+
+    # Extract temperature (Celsius)
+    temp_c_raw = obs_props.get("temperature", {}).get("value")
+    if temp_c_raw is None:
+        logger.warning("No temperature data in observation")
+        return None
+
+    temp_c = int(temp_c_raw)
+    temp_f = _C_TO_F.get(temp_c)
+    if temp_f is None:
+        temp_f = int((temp_c * 9/5) + 32)
+
+    # Extract condition description
+    condition_text = obs_props.get("textDescription", "Clear")
+
+    # Extract additional data (0 is a real reading, only None means missing)
+    feels_like_c = obs_props.get("heatIndex", {}).get("value")
+    if feels_like_c is None:
+        feels_like_c = obs_props.get("windChill", {}).get("value")
+    feels_like_f = int((feels_like_c * 9/5) + 32) if feels_like_c is not None else None
+
+    wind_speed_ms = obs_props.get("windSpeed", {}).get("value")
+    wind_speed_mph = int(wind_speed_ms * 2.237) if wind_speed_ms is not None else None
+
+    humidity = obs_props.get("relativeHumidity", {}).get("value")
+    humidity_percent = int(humidity) if humidity is not None else None
+
+    # Determine if night time based on icon URL
+    # NWS icons: https://api.weather.gov/icons/.../night/few?size=medium
+    icon_url = obs_props.get("icon", "")
+    is_night = "/night/" in icon_url or "nt_" in icon_url
+
+    # Map condition to emoji
+    emoji = get_condition_emoji(condition_text, is_night)
+
+    # Normalize city to nearest metro area
+    display_city = get_metro_name(latitude, longitude, city)
+
+    conditions = WeatherConditions(
+        temperature_f=temp_f,
+        temperature_c=temp_c,
+        condition=condition_text,
+        emoji=emoji,
+        city=display_city,
+        state=state,
+        feels_like_f=feels_like_f,
+        wind_speed_mph=wind_speed_mph,
+        humidity_percent=humidity_percent
+    )
+
+    logger.info(
+        f"Current conditions: {display_city}, {state} - {temp_f}°F {condition_text} {emoji}"
+    )
+
+    return conditions
+
+
+def _fetch_current_conditions(latitude: float, longitude: float) -> Optional[WeatherConditions]:
+    """
+    Fetch current conditions from NWS.
+
+    Returns None on failure, which is not cached.
+    """
+    try:
+        # Steps 1-2: point + station lookup (cached for a day, stations don't move)
+        station = _station_cache.get_or_load(
+            _cache_key(latitude, longitude),
+            lambda: _fetch_station(latitude, longitude)
+        )
+        if station is None:
             return None
 
-        # Get the first (nearest) station
-        station_url = features[0].get("id")
+        station_url, city, state = station
 
         # Step 3: Get latest observation
         observation_url = f"{station_url}/observations/latest"
         logger.debug(f"Fetching weather observation: {observation_url}")
 
-        observation_response = requests.get(
-            observation_url,
-            headers={"User-Agent": USER_AGENT},
-            timeout=5
-        )
+        observation_response = nws_session.get(observation_url, timeout=NWS_TIMEOUT)
 
         if observation_response.status_code != 200:
             logger.warning(f"Weather API observation lookup failed: {observation_response.status_code}")
             return None
 
-        observation_data = observation_response.json()
-        obs_props = observation_data.get("properties", {})
+        return _parse_observation(observation_response.json(), latitude, longitude, city, state)
 
-        # Extract temperature (Celsius)
-        temp_c_raw = obs_props.get("temperature", {}).get("value")
-        if temp_c_raw is None:
-            logger.warning("No temperature data in observation")
-            return None
+    except requests.Timeout:
+        logger.warning(f"Weather API timeout for {latitude}, {longitude}")
+        return None
+    except requests.RequestException as e:
+        logger.error(f"Weather API request error: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Weather API error: {e}", exc_info=True)
+        return None
 
-        temp_c = int(temp_c_raw)
-        temp_f = int((temp_c * 9/5) + 32)
 
-        # Extract condition description
-        condition_text = obs_props.get("textDescription", "Clear")
+async def get_current_conditions_async(latitude: float, longitude: float) -> Optional[WeatherConditions]:
+    """
+    Async version of get_current_conditions for callers on the event loop.
+
+    Shares the same caches, so a location looked up through either version
+    is served from memory by both.
+
+    Args:
+        latitude: Location latitude
+        longitude: Location longitude
+
+    Returns:
+        WeatherConditions object, or None if unavailable
+    """
+    cache_key = _cache_key(latitude, longitude)
 
-        # Extract additional data
-        feels_like_c = obs_props.get("heatIndex", {}).get("value") or obs_props.get("windChill", {}).get("value")
-        feels_like_f = int((feels_like_c * 9/5) + 32) if feels_like_c else None
+    if _failed_lookups.get(cache_key):
+        logger.debug(f"Weather conditions lookup recently failed for {cache_key}, skipping")
+        return None
 
-        wind_speed_ms = obs_props.get("windSpeed", {}).get("value")
-        wind_speed_mph = int(wind_speed_ms * 2.237) if wind_speed_ms else None
+    conditions = _conditions_cache.get(cache_key)
+    if conditions is not None:
+        return conditions
 
-        humidity = obs_props.get("relativeHumidity", {}).get("value")
-        humidity_percent = int(humidity) if humidity else None
+    conditions = await _fetch_current_conditions_async(latitude, longitude)
 
-        # Determine if night time based on icon URL
-        # NWS icons: https://api.weather.gov/icons/.../night/few?size=medium
-        icon_url = obs_props.get("icon", "")
-        is_night = "/night/" in icon_url or "nt_" in icon_url
+    if conditions is None:
+        _failed_lookups.set(cache_key, True)
+    else:
+        _conditions_cache.set(cache_key, conditions)
 
-        # Map condition to emoji
-        emoji = get_condition_emoji(condition_text, is_night)
+    return conditions
 
-        # Normalize city to nearest metro area
-        display_city = get_metro_name(latitude, longitude, city)
 
-        conditions = WeatherConditions(
-            temperature_f=temp_f,
-            temperature_c=temp_c,
-            condition=condition_text,
-            emoji=emoji,
-            city=display_city,
-            state=state,
-            feels_like_f=feels_like_f,
-            wind_speed_mph=wind_speed_mph,
-            humidity_percent=humidity_percent
-        )
+async def _fetch_current_conditions_async(latitude: float, longitude: float) -> Optional[WeatherConditions]:
+    """Async counterpart of _fetch_current_conditions. Returns None on failure."""
+    client = _get_async_client()
+    cache_key = _cache_key(latitude, longitude)
 
-        # Cache the results
-        _conditions_cache[cache_key] = (datetime.utcnow(), conditions)
+    try:
+        station = _station_cache.get(cache_key)
+        if station is None:
+            # Step 1: Get grid point for location
+            point = _point_cache.get(cache_key)
+            if point is None:
+                point_url = f"{WEATHER_API_BASE}/points/{latitude:.4f},{longitude:.4f}"
+                logger.debug(f"Fetching weather grid point: {point_url}")
 
-        logger.info(
-            f"Current conditions: {display_city}, {state} - {temp_f}°F {condition_text} {emoji}"
-        )
+                point_response = await client.get(point_url)
 
-        return conditions
+                if point_response.status_code != 200:
+                    logger.warning(
+                        f"Weather API point lookup failed: {point_response.status_code} "
+                        f"for {latitude}, {longitude}"
+                    )
+                    return None
 
-    except requests.Timeout:
+                point = _parse_point(point_response.json(), latitude, longitude)
+                if point is None:
+                    return None
+                _point_cache.set(cache_key, point)
+
+            observation_stations_url, city, state = point
+
+            # Step 2: Get nearest observation station
+            stations_response = await client.get(observation_stations_url)
+
+            if stations_response.status_code != 200:
+                logger.warning(f"Weather API stations lookup failed: {stations_response.status_code}")
+                return None
+
+            station_url = _parse_nearest_station(stations_response.json())
+            if station_url is None:
+                return None
+
+            station = (station_url, city, state)
+            _station_cache.set(cache_key, station)
+
+        station_url, city, state = station
+
+        # Step 3: Get latest observation
+        observation_url = f"{station_url}/observations/latest"
+        logger.debug(f"Fetching weather observation: {observation_url}")
+
+        observation_response = await client.get(observation_url)
+
+        if observation_response.status_code != 200:
+            logger.warning(f"Weather API observation lookup failed: {observation_response.status_code}")
+            return None
+
+        return _parse_observation(observation_response.json(), latitude, longitude, city, state)
+
+    except httpx.TimeoutException:
         logger.warning(f"Weather API timeout for {latitude}, {longitude}")
         return None
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Weather API request error: {e}")
         return None
     except Exception as e:
@@ -219,6 +498,20 @@ METRO_AREAS = [
 ]
 
 
+EARTH_RADIUS_MILES = 3958.8
+METRO_RADIUS_MILES = 30
+
+# Metro centers as (lat_rad, lon_rad, cos_lat, name), computed once
+_METRO_POINTS = tuple(
+    (math.radians(m_lat), math.radians(m_lon), math.cos(math.radians(m_lat)), m_name)
+    for m_lat, m_lon, m_name in METRO_AREAS
+)
+
+# Haversine "a" term at METRO_RADIUS_MILES. distance <= radius is the same
+# as a <= this, so the per-metro check needs no sqrt/asin.
+_METRO_MAX_HAVERSINE = math.sin(METRO_RADIUS_MILES / (2 * EARTH_RADIUS_MILES)) ** 2
+
+
 def get_metro_name(lat: float, lon: float, original_city: str) -> str:
     """
     Get major metro area name if within 30 miles, otherwise return original city.
@@ -231,27 +524,47 @@ def get_metro_name(lat: float, lon: float, original_city: str) -> str:
     Returns:
         Metro name or original city
     """
-    import math
-
-    def haversine_miles(lat1, lon1, lat2, lon2):
-        R = 3958.8  # Earth radius in miles
-        
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        a = (math.sin(dlat / 2) * math.sin(dlat / 2) +
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-             math.sin(dlon / 2) * math.sin(dlon / 2))
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
-
-    for m_lat, m_lon, m_name in METRO_AREAS:
-        distance = haversine_miles(lat, lon, m_lat, m_lon)
-        if distance <= 30:  # 30 mile radius
+    lat_r = math.radians(lat)
+    lon_r = math.radians(lon)
+    cos_lat = math.cos(lat_r)
+
+    for m_lat, m_lon, m_cos_lat, m_name in _METRO_POINTS:
+        sin_dlat = math.sin((m_lat - lat_r) / 2)
+        sin_dlon = math.sin((m_lon - lon_r) / 2)
+        a = sin_dlat * sin_dlat + cos_lat * m_cos_lat * sin_dlon * sin_dlon
+        if a <= _METRO_MAX_HAVERSINE:
             return m_name
-            
+
     return original_city
 
 
+# Define major metro areas with their approximate centers and radius
+# Format: (major_city, center_lat, center_lng, radius_miles)
+STATE_METRO_AREAS = {
+    "CA": [
+        ("Fresno", 36.7378, -119.7871, 30),
+        ("Los Angeles", 34.0522, -118.2437, 50),
+        ("San Francisco", 37.7749, -122.4194, 40),
+        ("San Diego", 32.7157, -117.1611, 30),
+        ("Sacramento", 38.5816, -121.4944, 30),
+        ("San Jose", 37.3382, -121.8863, 25),
+        ("Bakersfield", 35.3733, -119.0187, 25),
+        ("Stockton", 37.9577, -121.2908, 20),
+        ("Modesto", 37.6391, -120.9969, 20),
+    ],
+    "TX": [
+        ("Houston", 29.7604, -95.3698, 50),
+        ("Dallas", 32.7767, -96.7970, 50),
+        ("San Antonio", 29.4241, -98.4936, 40),
+        ("Austin", 30.2672, -97.7431, 35),
+    ],
+    "WY": [
+        ("Cheyenne", 41.1400, -104.8202, 30),
+    ],
+    # Add more as needed
+}
+
+
 def map_to_major_city(city: str, state: str, latitude: float, longitude: float) -> str:
     """
     Map small towns to their major metro area for better user recognition.
@@ -265,39 +578,13 @@ def map_to_major_city(city: str, state: str, latitude: float, longitude: float)
     Returns:
         Major city name if recognized, otherwise original city
     """
-    # Define major metro areas with their approximate centers and radius
-    # Format: (major_city, center_lat, center_lng, radius_miles)
-    METRO_AREAS = {
-        "CA": [
-            ("Fresno", 36.7378, -119.7871, 30),
-            ("Los Angeles", 34.0522, -118.2437, 50),
-            ("San Francisco", 37.7749, -122.4194, 40),
-            ("San Diego", 32.7157, -117.1611, 30),
-            ("Sacramento", 38.5816, -121.4944, 30),
-            ("San Jose", 37.3382, -121.8863, 25),
-            ("Bakersfield", 35.3733, -119.0187, 25),
-            ("Stockton", 37.9577, -121.2908, 20),
-            ("Modesto", 37.6391, -120.9969, 20),
-        ],
-        "TX": [
-            ("Houston", 29.7604, -95.3698, 50),
-            ("Dallas", 32.7767, -96.7970, 50),
-            ("San Antonio", 29.4241, -98.4936, 40),
-            ("Austin", 30.2672, -97.7431, 35),
-        ],
-        "WY": [
-            ("Cheyenne", 41.1400, -104.8202, 30),
-        ],
-        # Add more as needed
-    }
-
     # Skip if state not in our metro areas
-    if state not in METRO_AREAS:
+    metros = STATE_METRO_AREAS.get(state)
+    if not metros:
         return city
 
     # Check if location is within any metro area
-    for major_city, center_lat, center_lng, radius in METRO_AREAS[state]:
-        from app.utils.location import calculate_distance
+    for major_city, center_lat, center_lng, radius in metros:
         distance = calculate_distance(latitude, longitude, center_lat, center_lng)
 
         if distance <= radius:
@@ -308,6 +595,27 @@ def map_to_major_city(city: str, state: str, latitude: float, longitude: float)
     return city
 
 
+# (keyword, emoji) for conditions that look the same day or night,
+# in priority order - first keyword found wins
+_CONDITION_EMOJI_KEYWORDS = (
+    ("tornado", "🌪️"),
+    ("thunder", "⛈️"),
+    ("t-storm", "⛈️"),
+    ("snow", "❄️"),
+    ("flurr", "❄️"),
+    ("sleet", "🧊"),
+    ("freezing", "🧊"),
+    ("ice", "🧊"),
+    ("rain", "🌧️"),
+    ("shower", "🌧️"),
+    ("drizzle", "🌧️"),
+    ("fog", "🌫️"),
+    ("mist", "🌫️"),
+    ("haze", "🌫️"),
+    ("wind", "💨"),
+)
+
+
 def get_condition_emoji(condition: str, is_night: bool = False) -> str:
     """
     Get appropriate emoji for weather condition.
@@ -322,23 +630,12 @@ def get_condition_emoji(condition: str, is_night: bool = False) -> str:
     condition_lower = condition.lower()
 
     # Time-independent conditions (severe stuff usually same day/night or has no good night variant)
-    if "tornado" in condition_lower:
-        return "🌪️"
-    elif "thunder" in condition_lower or "t-storm" in condition_lower:
-        return "⛈️"
-    elif "snow" in condition_lower or "flurr" in condition_lower:
-        return "❄️"
-    elif "sleet" in condition_lower or "freezing" in condition_lower or "ice" in condition_lower:
-        return "🧊"
-    elif "rain" in condition_lower or "shower" in condition_lower or "drizzle" in condition_lower:
-        return "🌧️"
-    elif "fog" in condition_lower or "mist" in condition_lower or "haze" in condition_lower:
-        return "🌫️"
-    elif "wind" in condition_lower:
-        return "💨"
+    for keyword, emoji in _CONDITION_EMOJI_KEYWORDS:
+        if keyword in condition_lower:
+            return emoji
 
     # Time-dependent conditions
-    elif "cloud" in condition_lower or "overcast" in condition_lower:
+    if "cloud" in condition_lower or "overcast" in condition_lower:
         if "partly" in condition_lower or "few" in condition_lower or "scatter" in condition_lower:
             return "☁️" if is_night else "⛅"
         else:
@@ -382,13 +679,13 @@ def format_conditions_detailed(conditions: WeatherConditions) -> Dict:
         "state": conditions.state
     }
 
-    if conditions.feels_like_f:
+    if conditions.feels_like_f is not None:
         result["feels_like_f"] = conditions.feels_like_f
 
-    if conditions.wind_speed_mph:
+    if conditions.wind_speed_mph is not None:
         result["wind_speed_mph"] = conditions.wind_speed_mph
 
-    if conditions.humidity_percent:
+    if conditions.humidity_percent is not None:
         result["humidity_percent"] = conditions.humidity_percent
 
     return result
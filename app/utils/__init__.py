@@ -5,6 +5,8 @@ Utility Functions
 from app.utils.location import (
     fuzz_location,
     calculate_distance,
+    calculate_distances,
+    is_within_distance,
     get_bearing,
     is_location_stale,
     get_geohash_neighbors
@@ -13,6 +15,8 @@ from app.utils.location import (
 __all__ = [
     "fuzz_location",
     "calculate_distance",
+    "calculate_distances",
+    "is_within_distance",
     "get_bearing",
     "is_location_stale",
     "get_geohash_neighbors"
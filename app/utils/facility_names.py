@@ -0,0 +1,37 @@
+"""
+Facility Names
+Name normalization and similarity checks for facility duplicate detection
+"""
+
+import re
+
+_NAME_APOSTROPHES = re.compile(r"['’]")
+_NAME_WORD = re.compile(r"[a-z0-9]+")
+
+
+def name_words(name: str) -> frozenset:
+    """
+    Normalized word set of a facility name for similarity checks.
+
+    Apostrophes are dropped, other punctuation splits words and numbers
+    lose leading zeros, so "Love's Travel Stop #0412" and
+    "LOVES TRAVEL STOP 412" share their words.
+    """
+    words = _NAME_WORD.findall(_NAME_APOSTROPHES.sub("", name.casefold()))
+    return frozenset(word.lstrip("0") or "0" if word.isdigit() else word for word in words)
+
+
+def names_match(words1: frozenset, words2: frozenset) -> bool:
+    """
+    Name similarity check: more than half the words of the shorter name
+    appear in the other.
+
+    Args:
+        words1, words2: Word sets from name_words
+
+    Returns:
+        True if the names are similar enough to be the same facility
+    """
+    if not words1 or not words2:
+        return False
+    return len(words1 & words2) / min(len(words1), len(words2)) > 0.5
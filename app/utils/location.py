@@ -5,7 +5,12 @@ Helper functions for location fuzzing, distance calculation, and geospatial oper
 
 import random
 import math
-from typing import Tuple
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List, Tuple
+
+# Earth radius in miles
+EARTH_RADIUS_MILES = 3959.0
 
 
 def fuzz_location(latitude: float, longitude: float, radius_miles: float) -> Tuple[float, float]:
@@ -26,9 +31,10 @@ def fuzz_location(latitude: float, longitude: float, radius_miles: float) -> Tup
     radius_lat = radius_miles / 69.0
     radius_lng = radius_miles / (69.0 * math.cos(math.radians(latitude)))
 
-    # Generate random angle and distance
-    angle = random.uniform(0, 2 * math.pi)
-    distance = random.uniform(0, 1)  # Random distance within radius
+    # Generate random angle and distance (random() directly; uniform()
+    # is a Python-level wrapper around it)
+    angle = random.random() * (2 * math.pi)
+    distance = random.random()  # Random distance within radius
 
     # Apply offset
     fuzzed_lat = latitude + (radius_lat * distance * math.cos(angle))
@@ -48,8 +54,7 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     Returns:
         Distance in miles
     """
-    # Earth radius in miles
-    R = 3959.0
+    R = EARTH_RADIUS_MILES
 
     # Convert to radians
     lat1_rad = math.radians(lat1)
@@ -57,10 +62,12 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     delta_lat = math.radians(lat2 - lat1)
     delta_lon = math.radians(lon2 - lon1)
 
-    # Haversine formula
-    a = math.sin(delta_lat / 2) ** 2 + \
+    # Haversine formula (x * x avoids the pow() dispatch of x ** 2)
+    sin_half_dlat = math.sin(delta_lat * 0.5)
+    sin_half_dlon = math.sin(delta_lon * 0.5)
+    a = sin_half_dlat * sin_half_dlat + \
         math.cos(lat1_rad) * math.cos(lat2_rad) * \
-        math.sin(delta_lon / 2) ** 2
+        sin_half_dlon * sin_half_dlon
 
     c = 2 * math.asin(math.sqrt(a))
 
@@ -69,6 +76,81 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return distance
 
 
+def calculate_distances(
+    latitude: float,
+    longitude: float,
+    points: Iterable[Tuple[float, float]]
+) -> List[float]:
+    """
+    Calculate distances from one coordinate to many, e.g. to rank nearby
+    facilities. Same results as calling calculate_distance per point, with
+    the origin's trig and the function lookups done once.
+
+    Args:
+        latitude, longitude: Origin coordinate
+        points: (latitude, longitude) pairs
+
+    Returns:
+        Distance in miles to each point, in order
+    """
+    R = EARTH_RADIUS_MILES
+    radians = math.radians
+    sin = math.sin
+    cos = math.cos
+    asin = math.asin
+    sqrt = math.sqrt
+
+    cos_lat1 = cos(radians(latitude))
+
+    distances = []
+    for lat2, lon2 in points:
+        delta_lat = radians(lat2 - latitude)
+        delta_lon = radians(lon2 - longitude)
+
+        sin_half_dlat = sin(delta_lat * 0.5)
+        sin_half_dlon = sin(delta_lon * 0.5)
+        a = sin_half_dlat * sin_half_dlat + \
+            cos_lat1 * cos(radians(lat2)) * \
+            sin_half_dlon * sin_half_dlon
+
+        distances.append(R * (2 * asin(sqrt(a))))
+    return distances
+
+
+def is_within_distance(lat1: float, lon1: float, lat2: float, lon2: float, miles: float) -> bool:
+    """
+    Check whether two coordinates are within a distance of each other.
+
+    Same result as calculate_distance(...) <= miles, but compares the
+    Haversine term directly and skips the asin/sqrt. Use it for radius
+    filters that don't need the distance itself.
+
+    Args:
+        lat1, lon1: First coordinate
+        lat2, lon2: Second coordinate
+        miles: Maximum distance in miles
+
+    Returns:
+        True if the coordinates are at most `miles` apart
+    """
+    if miles >= math.pi * EARTH_RADIUS_MILES:
+        return True
+
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = lat2_rad - lat1_rad
+    delta_lon = math.radians(lon2 - lon1)
+
+    sin_half_dlat = math.sin(delta_lat * 0.5)
+    sin_half_dlon = math.sin(delta_lon * 0.5)
+    a = sin_half_dlat * sin_half_dlat + \
+        math.cos(lat1_rad) * math.cos(lat2_rad) * \
+        sin_half_dlon * sin_half_dlon
+
+    sin_half_max = math.sin(miles / (2 * EARTH_RADIUS_MILES))
+    return a <= sin_half_max * sin_half_max
+
+
 def get_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate bearing between two coordinates.
@@ -106,43 +188,78 @@ def is_location_stale(recorded_at: str, max_age_hours: int = 12) -> bool:
     Returns:
         True if location is stale
     """
-    from datetime import datetime, timedelta
+    if recorded_at.endswith("Z"):
+        recorded_at = recorded_at[:-1] + "+00:00"
+
+    recorded = datetime.fromisoformat(recorded_at)
+    if recorded.tzinfo is None:
+        # Timestamps without an offset are stored in UTC
+        recorded = recorded.replace(tzinfo=timezone.utc)
+
+    return time.time() - recorded.timestamp() > max_age_hours * 3600
+
 
-    recorded = datetime.fromisoformat(recorded_at.replace("Z", "+00:00"))
-    age = datetime.utcnow() - recorded.replace(tzinfo=None)
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
 
-    return age > timedelta(hours=max_age_hours)
+# Classic geohash adjacency tables for even-length hashes, per direction:
+# (character order of the neighboring cells, characters on that border).
+# Odd-length hashes use the table of the transposed direction.
+_GEOHASH_EVEN_TABLES = {
+    "n": ("p0r21436x8zb9dcf5h7kjnmqesgutwvy", "prxz"),
+    "s": ("14365h7k9dcfesgujnmqp0r2twvyx8zb", "028b"),
+    "e": ("bc01fg45238967deuvhjyznpkmstqrwx", "bcfguvyz"),
+    "w": ("238967debc01fg45kmstqrwxuvhjyznp", "0145hjnp"),
+}
+_GEOHASH_TRANSPOSED = {"n": "e", "e": "n", "s": "w", "w": "s"}
+
+
+def _build_geohash_tables():
+    """(direction, is_odd_length) -> (char -> neighbor char, border chars)"""
+    tables = {}
+    for direction, (neighbors, border) in _GEOHASH_EVEN_TABLES.items():
+        odd_neighbors, odd_border = _GEOHASH_EVEN_TABLES[_GEOHASH_TRANSPOSED[direction]]
+        for is_odd, (chars, edge) in ((False, (neighbors, border)), (True, (odd_neighbors, odd_border))):
+            step = {c: _GEOHASH_BASE32[i] for i, c in enumerate(chars)}
+            tables[(direction, is_odd)] = (step, frozenset(edge))
+    return tables
+
+
+_GEOHASH_TABLES = _build_geohash_tables()
+
+
+def _geohash_adjacent(geohash: str, direction: str) -> str:
+    """Geohash of the same-size cell next to this one in a direction (n/s/e/w)."""
+    last = geohash[-1]
+    parent = geohash[:-1]
+    step, border = _GEOHASH_TABLES[(direction, len(geohash) % 2 == 1)]
+
+    # Crossing the parent cell's edge moves the parent too
+    if last in border and parent:
+        parent = _geohash_adjacent(parent, direction)
+
+    return parent + step[last]
 
 
 def get_geohash_neighbors(geohash: str) -> list[str]:
     """
     Get neighboring geohash cells (for searching nearby areas).
 
+    Neighbors are found by character substitution, so they are exact at
+    every precision and need no decode/encode round trip.
+
     Args:
         geohash: Geohash string
 
     Returns:
-        List of neighbor geohash strings
+        The cell and its 8 neighbors, south-west to north-east
     """
-    import geohash as gh
-
-    # Decode geohash to coordinates
-    lat, lng = gh.decode(geohash)
-
-    # Calculate approximate cell size at this precision
-    precision = len(geohash)
-    cell_size_degrees = 180 / (2 ** (precision * 2.5))  # Approximate
-
-    # Generate neighbors
-    neighbors = []
-    for dlat in [-1, 0, 1]:
-        for dlng in [-1, 0, 1]:
-            if dlat == 0 and dlng == 0:
-                neighbors.append(geohash)
-            else:
-                neighbor_lat = lat + (dlat * cell_size_degrees)
-                neighbor_lng = lng + (dlng * cell_size_degrees)
-                neighbor_hash = gh.encode(neighbor_lat, neighbor_lng, precision=precision)
-                neighbors.append(neighbor_hash)
-
-    return neighbors
+    geohash = geohash.lower()
+
+    north = _geohash_adjacent(geohash, "n")
+    south = _geohash_adjacent(geohash, "s")
+
+    return [
+        _geohash_adjacent(south, "w"), south, _geohash_adjacent(south, "e"),
+        _geohash_adjacent(geohash, "w"), geohash, _geohash_adjacent(geohash, "e"),
+        _geohash_adjacent(north, "w"), north, _geohash_adjacent(north, "e"),
+    ]
@@ -0,0 +1,116 @@
+"""
+Spatial Index
+Grid bucketing of coordinates for fast "what's within N miles" lookups
+"""
+
+import math
+from typing import Any, Dict, Iterator, List, Tuple
+
+from app.utils.location import EARTH_RADIUS_MILES
+
+
+class GridIndex:
+    """
+    Points bucketed into a lat/lon grid.
+
+    A radius lookup only checks the cells the radius can reach instead of
+    every point, so building the index once and querying it per item turns
+    an N*M scan into roughly N+M. Cells wrap around the antimeridian.
+    """
+
+    def __init__(self, cell_miles: float):
+        """
+        Args:
+            cell_miles: Cell height in miles; use about the typical query radius
+        """
+        self._cell_lat = math.degrees(cell_miles / EARTH_RADIUS_MILES)
+        self._lon_cells = max(1, math.floor(360.0 / self._cell_lat))
+        self._cell_lon = 360.0 / self._lon_cells
+        # Each point is stored as (lat, lon, lat radians, cos(lat), item)
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, float, float, Any]]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _lat_cell(self, latitude: float) -> int:
+        return math.floor(latitude / self._cell_lat)
+
+    def _lon_cell(self, longitude: float) -> int:
+        # Count from -180 so the last cell borders cell 0
+        return math.floor((longitude + 180.0) / self._cell_lon) % self._lon_cells
+
+    def add(self, latitude: float, longitude: float, item: Any):
+        """Add an item at a coordinate."""
+        key = (self._lat_cell(latitude), self._lon_cell(longitude))
+        lat_rad = math.radians(latitude)
+        self._cells.setdefault(key, []).append((latitude, longitude, lat_rad, math.cos(lat_rad), item))
+        self._size += 1
+
+    def nearby(self, latitude: float, longitude: float, miles: float) -> Iterator[Any]:
+        """
+        Yield items within `miles` of a coordinate (great-circle distance),
+        in no particular order.
+        """
+        reach = miles / EARTH_RADIUS_MILES  # radians
+        reach_lat = math.degrees(reach)
+
+        # Longitude span of the radius widens with latitude; bound it using
+        # the smallest cos(lat) reachable within the radius
+        lat_rad = math.radians(latitude)
+        min_cos = math.cos(min(abs(lat_rad) + reach, math.pi / 2))
+        denominator = math.sqrt(max(math.cos(lat_rad) * min_cos, 0.0))
+        ratio = math.sin(reach / 2) / denominator if denominator else 2.0
+
+        if ratio >= 1.0:
+            lon_cells = range(self._lon_cells)
+            reach_lon = 360.0
+        else:
+            reach_lon = math.degrees(2 * math.asin(ratio))
+            first = math.floor((longitude + 180.0 - reach_lon) / self._cell_lon)
+            last = math.floor((longitude + 180.0 + reach_lon) / self._cell_lon)
+            if last - first + 1 >= self._lon_cells:
+                lon_cells = range(self._lon_cells)
+            else:
+                lon_cells = [cell % self._lon_cells for cell in range(first, last + 1)]
+
+        # Same test as is_within_distance, with the per-point trig done once
+        # in add(). Points outside the lat/lon reach can't be within the
+        # radius, so cheap comparisons reject most of a cell first.
+        if miles >= math.pi * EARTH_RADIUS_MILES:
+            max_a = 2.0  # Everything is in range
+        else:
+            sin_half_max = math.sin(miles / (2 * EARTH_RADIUS_MILES))
+            max_a = sin_half_max * sin_half_max
+        cos_lat = math.cos(lat_rad)
+        radians = math.radians
+        sin = math.sin
+
+        lat_cells = range(self._lat_cell(latitude - reach_lat), self._lat_cell(latitude + reach_lat) + 1)
+        cells = self._cells
+        if len(lat_cells) * len(lon_cells) > len(cells):
+            # Radius spans more cells than are occupied (huge radius or near
+            # a pole): scan the occupied ones, the checks below still apply
+            buckets = cells.values()
+        else:
+            buckets = (
+                cells.get((lat_cell, lon_cell), ())
+                for lat_cell in lat_cells
+                for lon_cell in lon_cells
+            )
+
+        for bucket in buckets:
+            for point_lat, point_lon, point_lat_rad, point_cos_lat, item in bucket:
+                if abs(point_lat - latitude) > reach_lat:
+                    continue
+                delta_lon = abs(point_lon - longitude)
+                if delta_lon > reach_lon and 360.0 - delta_lon > reach_lon:
+                    continue
+
+                sin_half_dlat = sin((point_lat_rad - lat_rad) * 0.5)
+                sin_half_dlon = sin(radians(point_lon - longitude) * 0.5)
+                a = sin_half_dlat * sin_half_dlat + \
+                    cos_lat * point_cos_lat * \
+                    sin_half_dlon * sin_half_dlon
+                if a <= max_a:
+                    yield item
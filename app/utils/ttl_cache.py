@@ -0,0 +1,97 @@
+"""
+TTL Cache
+Bounded in-process cache with per-entry expiry and request coalescing
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with a per-entry TTL.
+
+    Least recently used entries are evicted once maxsize is reached.
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, wait_timeout: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.wait_timeout = wait_timeout
+        self._data: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _get_locked(self, key: Hashable, now: float):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if now >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _set_locked(self, key: Hashable, value: Any, now: float):
+        self._data[key] = (value, now + self.ttl_seconds)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, or default if missing or expired."""
+        with self._lock:
+            entry = self._get_locked(key, time.monotonic())
+        return default if entry is None else entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value for ttl_seconds."""
+        with self._lock:
+            self._set_locked(key, value, time.monotonic())
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, calling loader() on a miss.
+
+        Concurrent misses for the same key share a single loader() call
+        instead of each hitting the upstream. A None result is returned to
+        every waiter but is not cached.
+        """
+        with self._lock:
+            entry = self._get_locked(key, time.monotonic())
+            if entry is not None:
+                return entry[0]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            return future.result(timeout=self.wait_timeout)
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if value is not None:
+                self._set_locked(key, value, time.monotonic())
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._data.clear()
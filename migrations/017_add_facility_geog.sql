@@ -0,0 +1,17 @@
+-- Migration: 017_add_facility_geog
+-- Description: Add indexed geography column to facilities for server-side radius queries (ST_DWithin)
+-- Date: 2026-10-16
+
+-- PostGIS is enabled in 002_add_driver_locations
+CREATE EXTENSION IF NOT EXISTS postgis;
+
+-- Kept in sync with latitude/longitude automatically
+ALTER TABLE facilities
+ADD COLUMN IF NOT EXISTS geog geography(Point, 4326)
+GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_facilities_geog ON facilities USING GIST (geog);
+
+INSERT INTO migration_history (migration_name, description)
+VALUES ('017_add_facility_geog', 'Add indexed geography column to facilities for radius queries')
+ON CONFLICT (migration_name) DO NOTHING;
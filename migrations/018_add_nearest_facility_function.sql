@@ -0,0 +1,36 @@
+-- Migration: 018_add_nearest_facility_function
+-- Description: Add nearest_facility() so radius lookups use the geog GIST index (ST_DWithin + KNN)
+-- Date: 2026-10-16
+
+-- ============================================================================
+-- HELPER FUNCTION: Nearest facility within a radius
+-- ============================================================================
+-- Uses idx_facilities_geog from 017_add_facility_geog. Called from
+-- find_nearby_facility via db.rpc("nearest_facility", ...).
+CREATE OR REPLACE FUNCTION nearest_facility(
+    p_latitude FLOAT,
+    p_longitude FLOAT,
+    p_max_meters FLOAT
+)
+RETURNS TABLE (
+    id UUID,
+    name VARCHAR(255),
+    distance_meters FLOAT
+) AS $$
+    SELECT
+        f.id,
+        f.name,
+        ST_Distance(f.geog, origin.geog) AS distance_meters
+    FROM facilities f,
+        (SELECT ST_SetSRID(ST_MakePoint(p_longitude, p_latitude), 4326)::geography AS geog) origin
+    WHERE ST_DWithin(f.geog, origin.geog, p_max_meters)
+    ORDER BY f.geog <-> origin.geog
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================================================
+-- RECORD MIGRATION
+-- ============================================================================
+INSERT INTO migration_history (migration_name, description)
+VALUES ('018_add_nearest_facility_function', 'Add nearest_facility() radius lookup using the geog index')
+ON CONFLICT (migration_name) DO NOTHING;
@@ -0,0 +1,47 @@
+-- Migration: 019_add_nearest_facilities_function
+-- Description: Add nearest_facilities() for "K closest facilities" lookups ordered by the geog KNN index
+-- Date: 2026-10-16
+
+-- ============================================================================
+-- HELPER FUNCTION: K nearest facilities
+-- ============================================================================
+-- Uses idx_facilities_geog from 017_add_facility_geog. Unlike
+-- nearest_facility() (018) there is no radius cutoff; rows come back
+-- closest first with their distance. p_data_source optionally limits the
+-- search to one source (e.g. 'openstreetmap').
+CREATE OR REPLACE FUNCTION nearest_facilities(
+    p_latitude FLOAT,
+    p_longitude FLOAT,
+    p_limit INT DEFAULT 10,
+    p_data_source VARCHAR(50) DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    name VARCHAR(255),
+    type VARCHAR(50),
+    latitude FLOAT,
+    longitude FLOAT,
+    data_source VARCHAR(50),
+    distance_meters FLOAT
+) AS $$
+    SELECT
+        f.id,
+        f.name,
+        f.type,
+        f.latitude,
+        f.longitude,
+        f.data_source,
+        ST_Distance(f.geog, origin.geog) AS distance_meters
+    FROM facilities f,
+        (SELECT ST_SetSRID(ST_MakePoint(p_longitude, p_latitude), 4326)::geography AS geog) origin
+    WHERE p_data_source IS NULL OR f.data_source = p_data_source
+    ORDER BY f.geog <-> origin.geog
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================================================
+-- RECORD MIGRATION
+-- ============================================================================
+INSERT INTO migration_history (migration_name, description)
+VALUES ('019_add_nearest_facilities_function', 'Add nearest_facilities() K-nearest lookup using the geog index')
+ON CONFLICT (migration_name) DO NOTHING;
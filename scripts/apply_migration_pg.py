@@ -41,7 +41,12 @@ def run_migration(migration_file: str):
         logger.info("Executing migration SQL...")
 
         try:
-            # Execute the entire SQL file
+            # Data migrations can write many rows; don't wait on a WAL flush
+            # for this transaction. SET LOCAL ends with the transaction, and
+            # a crash can at worst lose the whole migration, never part of it.
+            cur.execute("SET LOCAL synchronous_commit = off")
+
+            # Execute the entire SQL file in one round trip and one transaction
             cur.execute(sql)
             conn.commit()
 
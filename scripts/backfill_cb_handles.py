@@ -5,17 +5,25 @@ Usage: python -m scripts.backfill_cb_handles
 """
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import get_db_admin
 from app.services.cb_handle_generator import generate_cb_handle
 
+# Drivers updated per upsert request
+BATCH_SIZE = 500
+
+# Upsert requests in flight at once
+UPLOAD_WORKERS = 8
+
 
 def backfill():
     db = get_db_admin()
 
     # Get all drivers without cb_handle
-    response = db.from_("drivers").select("id, handle").is_("cb_handle", "null").execute()
+    # handle and avatar_id are NOT NULL, so upsert rows must carry them
+    response = db.from_("drivers").select("id, handle, avatar_id").is_("cb_handle", "null").execute()
 
     if not response.data:
         print("No drivers need backfill.")
@@ -25,15 +33,29 @@ def backfill():
     existing = db.from_("drivers").select("cb_handle").not_.is_("cb_handle", "null").execute()
     existing_handles = {d["cb_handle"] for d in existing.data} if existing.data else set()
 
-    count = 0
+    # Handles are generated up front in one thread so they stay unique
+    rows = []
     for driver in response.data:
         handle = generate_cb_handle(existing_handles)
         existing_handles.add(handle)
 
-        db.from_("drivers").update({"cb_handle": handle}).eq("id", driver["id"]).execute()
-        count += 1
+        rows.append({
+            "id": driver["id"],
+            "handle": driver["handle"],
+            "avatar_id": driver["avatar_id"],
+            "cb_handle": handle,
+        })
         print(f"  {driver['handle']} -> {handle}")
 
+    def upload(batch):
+        db.from_("drivers").upsert(batch, on_conflict="id").execute()
+        return len(batch)
+
+    # Batches are independent, so overlap their round trips
+    batches = [rows[i:i + BATCH_SIZE] for i in range(0, len(rows), BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+        count = sum(pool.map(upload, batches))
+
     print(f"\nBackfilled {count} drivers with CB handles.")
 
 
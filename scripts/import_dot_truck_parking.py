@@ -15,6 +15,11 @@ import csv
 import json
 from io import StringIO
 
+try:
+    import orjson  # Faster decoding of large ArcGIS pages, if installed
+except ImportError:
+    orjson = None
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from dotenv import load_dotenv
@@ -22,6 +27,8 @@ load_dotenv()
 
 from supabase import create_client
 from app.utils.location import calculate_distance
+from app.utils.spatial_index import GridIndex
+from app.utils.facility_names import name_words, names_match
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -30,17 +37,54 @@ logger = logging.getLogger(__name__)
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SECRET_KEY = os.getenv("SUPABASE_SECRET_KEY")
 
+# Optional direct PostgreSQL connection; when set, new facilities are
+# loaded with COPY instead of REST inserts
+DATABASE_URL = os.getenv("DATABASE_URL")
+
 db = create_client(SUPABASE_URL, SUPABASE_SECRET_KEY)
 
 # ArcGIS Feature Server endpoint for truck parking data
 DOT_PARKING_API = "https://geo.dot.gov/server/rest/services/Hosted/Truck_Stop_Parking/FeatureServer/0/query"
 
+# Features per ArcGIS query page
+DOWNLOAD_PAGE_SIZE = 2000
+
+# Rows per Supabase insert/upsert request
+BATCH_SIZE = 500
+
+# Existing facility columns needed for duplicate detection and merging
+# (type is required by the merge upsert)
+EXISTING_FACILITY_COLUMNS = "id,name,type,latitude,longitude,data_source,data_sources,parking_spaces,metadata"
+
+# Columns written by the COPY path, in order
+COPY_COLUMNS = ('name', 'type', 'latitude', 'longitude', 'parking_spaces',
+                'data_source', 'data_sources', 'metadata')
+
+# Columns an upsert row must carry besides the updates (NOT NULL in the
+# facilities table, so required even when the row already exists)
+UPSERT_BASE_FIELDS = ('id', 'name', 'type', 'latitude', 'longitude')
+
+# Facilities closer than this are candidates for the same site
+DUPLICATE_RADIUS_MILES = 0.1
+
+
+class DownloadIncompleteError(Exception):
+    """Raised when the DOT download fails partway through paging"""
+
+
 def download_dot_parking_data():
     """
     Download truck parking data from U.S. DOT ArcGIS Feature Server
 
-    Returns:
-        List of parking facility dictionaries
+    Pages through the layer DOWNLOAD_PAGE_SIZE features at a time, so only
+    one page of raw JSON is held in memory while features are parsed.
+
+    Yields:
+        ArcGIS feature dictionaries
+
+    Raises:
+        DownloadIncompleteError: If a page after the first fails, so a
+            truncated dataset is never imported as if it were complete
     """
     logger.info("Downloading truck parking data from U.S. DOT...")
 
@@ -48,25 +92,41 @@ def download_dot_parking_data():
         'where': '1=1',  # Get all records
         'outFields': '*',  # Get all fields
         'f': 'json',  # JSON format
-        'returnGeometry': 'true'
+        'returnGeometry': 'true',
+        'orderByFields': 'OBJECTID',  # Stable order across pages
+        'resultRecordCount': DOWNLOAD_PAGE_SIZE
     }
 
-    try:
-        response = requests.get(DOT_PARKING_API, params=params, timeout=60)
-        response.raise_for_status()
+    offset = 0
+    with requests.Session() as session:
+        while True:
+            params['resultOffset'] = offset
 
-        data = response.json()
+            try:
+                response = session.get(DOT_PARKING_API, params=params, timeout=60)
+                response.raise_for_status()
+                data = orjson.loads(response.content) if orjson else response.json()
+            except Exception as e:
+                logger.error(f"Error downloading DOT data at offset {offset}: {e}")
+                if offset:
+                    raise DownloadIncompleteError(f"download stopped after {offset} features") from e
+                return
 
-        if 'features' not in data:
-            logger.error("No features found in response")
-            return []
+            if 'features' not in data:
+                logger.error("No features found in response")
+                if offset:
+                    raise DownloadIncompleteError(f"download stopped after {offset} features")
+                return
 
-        logger.info(f"Downloaded {len(data['features'])} parking facilities")
-        return data['features']
+            features = data['features']
+            yield from features
 
-    except Exception as e:
-        logger.error(f"Error downloading DOT data: {e}")
-        return []
+            offset += len(features)
+            logger.info(f"Downloaded {offset} parking facilities")
+
+            # ArcGIS sets exceededTransferLimit while more pages remain
+            if not features or not data.get('exceededTransferLimit'):
+                return
 
 
 def parse_dot_facility(feature):
@@ -132,8 +192,7 @@ def parse_dot_facility(feature):
             'parking_spaces': parking_spaces,
             'data_source': 'usdot_ntad',
             'data_sources': ['usdot_ntad'],
-            'metadata': metadata if metadata else None,
-            'dot_attributes': attrs  # Keep for duplicate detection
+            'metadata': metadata if metadata else None
         }
 
     except Exception as e:
@@ -141,7 +200,30 @@ def parse_dot_facility(feature):
         return None
 
 
-def find_duplicate(new_facility, existing_facilities):
+def index_existing_facilities(existing_facilities):
+    """
+    Build a spatial grid of existing facilities for find_duplicate.
+
+    A lookup only checks the grid cells within the duplicate radius
+    instead of every facility. Name words are computed once here.
+
+    Args:
+        existing_facilities: List of existing facilities from DB
+
+    Returns:
+        GridIndex of (position, name_words, facility)
+    """
+    index = GridIndex(DUPLICATE_RADIUS_MILES)
+    for position, existing in enumerate(existing_facilities):
+        index.add(
+            existing['latitude'],
+            existing['longitude'],
+            (position, name_words(existing['name']), existing)
+        )
+    return index
+
+
+def find_duplicate(new_facility, existing_index):
     """
     Check if facility already exists in database
 
@@ -151,37 +233,110 @@ def find_duplicate(new_facility, existing_facilities):
 
     Args:
         new_facility: Facility dict to check
-        existing_facilities: List of existing facilities from DB
+        existing_index: Spatial grid from index_existing_facilities
 
     Returns:
         Existing facility dict if duplicate found, None otherwise
+        (the earliest one in load order if several match)
     """
-    for existing in existing_facilities:
-        distance = calculate_distance(
-            new_facility['latitude'],
-            new_facility['longitude'],
-            existing['latitude'],
-            existing['longitude']
-        )
+    words_new = name_words(new_facility['name'])
+
+    if not words_new:
+        return None
+
+    best = None
+    nearby = existing_index.nearby(new_facility['latitude'], new_facility['longitude'], DUPLICATE_RADIUS_MILES)
+    for position, words_existing, existing in nearby:
+        # Within 0.1 miles and a similar name = likely same facility
+        if (best is None or position < best[0]) and names_match(words_new, words_existing):
+            best = (position, existing)
+
+    if best is None:
+        return None
+
+    existing = best[1]
+    distance = calculate_distance(
+        new_facility['latitude'], new_facility['longitude'],
+        existing['latitude'], existing['longitude']
+    )
+    logger.info(f"Duplicate found: '{new_facility['name']}' matches '{existing['name']}' ({distance:.3f} miles)")
+    return existing
+
+
+# Server-side duplicate candidates (needs migration 017 for facilities.geog),
+# nearest first. $1/$2 are lon/lat, $3 the radius in meters.
+NEARBY_FACILITIES_SQL = f"""
+    PREPARE nearby_facilities(float8, float8, float8) AS
+    SELECT {EXISTING_FACILITY_COLUMNS},
+           ST_Distance(geog, ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography) AS distance_m
+    FROM facilities
+    WHERE ST_DWithin(geog, ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography, $3)
+    ORDER BY distance_m
+"""
+
+
+def connect_nearby_lookup():
+    """
+    Open a direct PostgreSQL cursor with the nearby_facilities query
+    prepared, for find_duplicate_nearby.
+
+    Returns:
+        (connection, cursor), or None if DATABASE_URL/psycopg2 are
+        unavailable or the query can't be prepared
+    """
+    if not DATABASE_URL:
+        return None
+
+    try:
+        import psycopg2
+        import psycopg2.extras
+    except ImportError:
+        logger.warning("psycopg2 not installed, using client-side duplicate detection")
+        return None
+
+    conn = None
+    try:
+        conn = psycopg2.connect(DATABASE_URL)
+        conn.set_session(readonly=True, autocommit=True)
+        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cur.execute(NEARBY_FACILITIES_SQL)
+        return conn, cur
+    except Exception as e:
+        logger.warning(f"Server-side duplicate lookup unavailable ({e}), using client-side detection")
+        if conn is not None:
+            conn.close()
+        return None
+
+
+def find_duplicate_nearby(new_facility, cur):
+    """
+    Check if facility already exists in database, using the GIST-indexed
+    geog column instead of a client-side index.
 
-        # Within 0.1 miles = likely same facility
-        if distance <= 0.1:
-            # Simple name similarity check
-            new_name = new_facility['name'].lower()
-            existing_name = existing['name'].lower()
+    Same rules as find_duplicate; if several facilities match, the
+    nearest one is returned.
 
-            # Check if names overlap significantly
-            words_new = set(new_name.split())
-            words_existing = set(existing_name.split())
+    Args:
+        new_facility: Facility dict to check
+        cur: Cursor from connect_nearby_lookup
+
+    Returns:
+        Existing facility dict if duplicate found, None otherwise
+    """
+    words_new = name_words(new_facility['name'])
+    if not words_new:
+        return None
 
-            # If 50%+ of words match, it's likely the same facility
-            if words_new and words_existing:
-                overlap = len(words_new & words_existing)
-                similarity = overlap / min(len(words_new), len(words_existing))
+    cur.execute(
+        "EXECUTE nearby_facilities(%s, %s, %s)",
+        (new_facility['longitude'], new_facility['latitude'], DUPLICATE_RADIUS_MILES * 1609.344)
+    )
 
-                if similarity > 0.5:
-                    logger.info(f"Duplicate found: '{new_facility['name']}' matches '{existing['name']}' ({distance:.3f} miles)")
-                    return existing
+    for existing in cur.fetchall():
+        if names_match(words_new, name_words(existing['name'])):
+            distance = existing.pop('distance_m') / 1609.344
+            logger.info(f"Duplicate found: '{new_facility['name']}' matches '{existing['name']}' ({distance:.3f} miles)")
+            return dict(existing)
 
     return None
 
@@ -195,7 +350,8 @@ def merge_facility_data(existing, new_data):
         new_data: New facility data from DOT
 
     Returns:
-        Updated facility dict
+        Fields to update; empty if the facility already has all of the
+        DOT data (e.g. on a re-import), so no write is needed
     """
     updates = {}
 
@@ -209,17 +365,117 @@ def merge_facility_data(existing, new_data):
     if new_data.get('parking_spaces') and not existing.get('parking_spaces'):
         updates['parking_spaces'] = new_data['parking_spaces']
 
-    # Merge metadata
+    # Merge metadata, only if DOT adds or changes a key
     existing_metadata = existing.get('metadata', {}) or {}
     new_metadata = new_data.get('metadata', {}) or {}
 
-    if new_metadata:
+    missing = object()
+    if any(existing_metadata.get(k, missing) != v for k, v in new_metadata.items()):
         merged_metadata = {**existing_metadata, **new_metadata}
         updates['metadata'] = merged_metadata
 
     return updates
 
 
+def flush_inserts(rows, stats):
+    """Insert buffered new facilities in one request and clear the buffer."""
+    if not rows:
+        return
+
+    try:
+        db.from_("facilities").insert(rows).execute()
+        stats['new'] += len(rows)
+    except Exception as e:
+        logger.error(f"Error inserting batch of {len(rows)} facilities: {e}")
+        stats['error'] += len(rows)
+
+    rows.clear()
+
+
+def _pg_text_array(values):
+    """Format a list of strings as a PostgreSQL array literal."""
+    quoted = ('"' + v.replace('\\', '\\\\').replace('"', '\\"') + '"' for v in values)
+    return '{' + ','.join(quoted) + '}'
+
+
+def copy_new_facilities(rows, stats):
+    """
+    Load new facilities with a single COPY over a direct PostgreSQL
+    connection, in one transaction.
+
+    Returns:
+        True if the rows were handled (loaded or counted as errors),
+        False if psycopg2 is unavailable and the caller should use REST
+    """
+    if not rows:
+        return True
+
+    try:
+        import psycopg2
+    except ImportError:
+        logger.warning("psycopg2 not installed, falling back to REST inserts")
+        return False
+
+    buf = StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        metadata = row.get('metadata')
+        writer.writerow([
+            row['name'],
+            row['type'],
+            row['latitude'],
+            row['longitude'],
+            row.get('parking_spaces'),  # None -> empty field -> NULL
+            row['data_source'],
+            _pg_text_array(row['data_sources']),
+            json.dumps(metadata) if metadata is not None else None
+        ])
+    buf.seek(0)
+
+    sql = f"COPY facilities ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+    conn = None
+    try:
+        conn = psycopg2.connect(DATABASE_URL)
+        with conn:
+            with conn.cursor() as cur:
+                cur.copy_expert(sql, buf)
+        stats['new'] += len(rows)
+    except Exception as e:
+        logger.error(f"Error copying {len(rows)} facilities: {e}")
+        stats['error'] += len(rows)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    return True
+
+
+def flush_updates(pending_updates, stats):
+    """
+    Upsert buffered merges keyed on id and clear the buffer.
+
+    Rows in one upsert must share the same columns, so merges are grouped
+    by which fields they update.
+    """
+    if not pending_updates:
+        return
+
+    groups = {}
+    for row in pending_updates.values():
+        groups.setdefault(frozenset(row), []).append(row)
+
+    for rows in groups.values():
+        try:
+            db.from_("facilities").upsert(rows, on_conflict="id").execute()
+            stats['merged'] += len(rows)
+        except Exception as e:
+            logger.error(f"Error merging batch of {len(rows)} facilities: {e}")
+            stats['error'] += len(rows)
+
+    pending_updates.clear()
+
+
 def import_parking_data():
     """
     Main import function
@@ -231,33 +487,50 @@ def import_parking_data():
     logger.info("U.S. DOT TRUCK PARKING DATA IMPORT")
     logger.info("="*80)
 
-    # Download data
-    features = download_dot_parking_data()
+    # Download and parse facilities page by page
+    logger.info("Parsing facilities...")
+    parsed_facilities = []
+    downloaded = 0
+
+    try:
+        for feature in download_dot_parking_data():
+            downloaded += 1
+            facility = parse_dot_facility(feature)
+            if facility:
+                parsed_facilities.append(facility)
+    except DownloadIncompleteError as e:
+        logger.error(f"Aborting import, DOT data is incomplete ({e})")
+        return
 
-    if not features:
+    if not downloaded:
         logger.error("No data to import")
         return
 
-    # Parse facilities
-    logger.info("Parsing facilities...")
-    parsed_facilities = []
+    logger.info(f"Successfully parsed {len(parsed_facilities)} facilities")
 
-    for feature in features:
-        facility = parse_dot_facility(feature)
-        if facility:
-            parsed_facilities.append(facility)
+    # Look up duplicates in PostGIS when a direct connection is available,
+    # otherwise load existing facilities into a client-side index
+    nearby_lookup = connect_nearby_lookup()
 
-    logger.info(f"Successfully parsed {len(parsed_facilities)} facilities")
+    if nearby_lookup:
+        logger.info("Checking duplicates server-side with ST_DWithin")
+        _, nearby_cur = nearby_lookup
 
-    # Get existing facilities from database
-    logger.info("Loading existing facilities from database...")
-    try:
-        result = db.from_("facilities").select("*").execute()
-        existing_facilities = result.data
-        logger.info(f"Found {len(existing_facilities)} existing facilities")
-    except Exception as e:
-        logger.error(f"Error loading existing facilities: {e}")
-        return
+        def lookup_duplicate(facility):
+            return find_duplicate_nearby(facility, nearby_cur)
+    else:
+        logger.info("Loading existing facilities from database...")
+        try:
+            result = db.from_("facilities").select(EXISTING_FACILITY_COLUMNS).execute()
+            existing_facilities = result.data
+            logger.info(f"Found {len(existing_facilities)} existing facilities")
+            existing_index = index_existing_facilities(existing_facilities)
+        except Exception as e:
+            logger.error(f"Error loading existing facilities: {e}")
+            return
+
+        def lookup_duplicate(facility):
+            return find_duplicate(facility, existing_index)
 
     # Import with duplicate detection
     logger.info("Importing facilities...")
@@ -269,35 +542,54 @@ def import_parking_data():
         'error': 0
     }
 
+    # Writes are buffered and sent BATCH_SIZE rows per request
+    new_rows = []
+    pending_updates = {}  # existing facility id -> upsert row
+
     for i, facility in enumerate(parsed_facilities, 1):
         if i % 100 == 0:
             logger.info(f"Progress: {i}/{len(parsed_facilities)}")
 
         try:
             # Check for duplicates
-            duplicate = find_duplicate(facility, existing_facilities)
+            duplicate = lookup_duplicate(facility)
 
             if duplicate:
                 # Merge data into existing facility
                 updates = merge_facility_data(duplicate, facility)
 
                 if updates:
-                    db.from_("facilities").update(updates).eq("id", duplicate["id"]).execute()
-                    stats['merged'] += 1
+                    # Several DOT rows can match one facility; later updates win
+                    row = pending_updates.get(duplicate["id"])
+                    if row is None:
+                        row = {k: duplicate[k] for k in UPSERT_BASE_FIELDS}
+                        pending_updates[duplicate["id"]] = row
+                    row.update(updates)
+
+                    if len(pending_updates) >= BATCH_SIZE:
+                        flush_updates(pending_updates, stats)
                 else:
                     stats['duplicate'] += 1
             else:
                 # Insert new facility
-                # Remove temporary fields before insert
-                facility_clean = {k: v for k, v in facility.items() if k != 'dot_attributes'}
-
-                db.from_("facilities").insert(facility_clean).execute()
-                stats['new'] += 1
+                new_rows.append(facility)
+                if not DATABASE_URL and len(new_rows) >= BATCH_SIZE:
+                    flush_inserts(new_rows, stats)
 
         except Exception as e:
             logger.error(f"Error importing facility '{facility['name']}': {e}")
             stats['error'] += 1
 
+    if nearby_lookup:
+        nearby_lookup[0].close()
+
+    # New facilities go in with one COPY when a direct connection is
+    # configured; merges stay on REST since there are few of them
+    if not (DATABASE_URL and copy_new_facilities(new_rows, stats)):
+        for start in range(0, len(new_rows), BATCH_SIZE):
+            flush_inserts(new_rows[start:start + BATCH_SIZE], stats)
+    flush_updates(pending_updates, stats)
+
     # Print summary
     logger.info("="*80)
     logger.info("IMPORT COMPLETE")
@@ -310,13 +602,18 @@ def import_parking_data():
 
     # Verify database
     logger.info("\nVerifying database...")
-    result = db.from_("facilities").select("*").eq("data_source", "usdot_ntad").execute()
-    logger.info(f"Facilities from DOT in database: {len(result.data)}")
+    # Count server-side and fetch only the sample rows
+    result = db.from_("facilities") \
+        .select("name,type,latitude,longitude,parking_spaces", count="exact") \
+        .eq("data_source", "usdot_ntad") \
+        .limit(5) \
+        .execute()
+    logger.info(f"Facilities from DOT in database: {result.count}")
 
     # Sample facilities
     if result.data:
         logger.info("\nSample imported facilities:")
-        for i, fac in enumerate(result.data[:5], 1):
+        for i, fac in enumerate(result.data, 1):
             logger.info(f"{i}. {fac['name']} ({fac['type']})")
             logger.info(f"   Location: ({fac['latitude']:.4f}, {fac['longitude']:.4f})")
             if fac.get('parking_spaces'):
@@ -5,15 +5,33 @@ Usage:
     python scripts/import_osm_facilities.py --state California
     python scripts/import_osm_facilities.py --state Texas --dry-run
     python scripts/import_osm_facilities.py --all-states
+    python scripts/import_osm_facilities.py --state Texas --source pbf
 """
 
 import os
+import re
 import sys
+import gzip
+import math
+import hashlib
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import argparse
+try:
+    import orjson  # Faster decoding of multi-MB Overpass responses, if installed
+except ImportError:
+    orjson = None
+try:
+    import osmium  # Reads Geofabrik PBF extracts for --source pbf, if installed
+except ImportError:
+    osmium = None
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 import time
 
 # Add parent directory to path for imports
@@ -23,8 +41,13 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from dotenv import load_dotenv
 load_dotenv()
 
+import httpx
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
-from app.utils.location import calculate_distance
+import geohash as gh
+from app.utils.location import EARTH_RADIUS_MILES
+from app.utils.spatial_index import GridIndex
+from app.utils.facility_names import name_words, names_match
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -66,6 +89,206 @@ OVERPASS_URLS = [
     "https://overpass.kumi.systems/api/interpreter",
 ]
 
+# Overpass queries in flight at once; public instances allow about two
+# concurrent slots per client
+OVERPASS_WORKERS = 2
+
+# Bounding boxes merged into one Overpass query for --all-regions
+MAX_BBOXES_PER_QUERY = 6
+
+# Tag filters for truck-related facilities; each is queried for nodes and ways
+FACILITY_FILTERS = (
+    '["amenity"="fuel"]["hgv"="yes"]',  # Truck stops (fuel stations that accept trucks)
+    '["highway"="rest_area"]',  # Rest areas
+    '["amenity"="parking"]["hgv"="yes"]',  # Truck parking
+    '["highway"="services"]',  # Service areas (often have truck facilities)
+)
+
+# Shared session so consecutive Overpass queries reuse the connection.
+# Rate limits and gateway errors are retried with backoff (honouring
+# Retry-After) before run_overpass_query moves on to the next instance.
+# Read timeouts are not retried: a query that hung once will likely hang
+# again, so the next instance is tried instead. Overpass queries are
+# read-only, so POST is safe to retry.
+overpass_session = requests.Session()
+overpass_session.headers.update({"User-Agent": "FindTruckDriver-importer/1.0 (contact@findtruckdriver.com)"})
+overpass_session.mount("https://", HTTPAdapter(
+    pool_connections=len(OVERPASS_URLS),
+    pool_maxsize=OVERPASS_WORKERS,
+    max_retries=Retry(
+        total=3,
+        read=0,
+        backoff_factor=2,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+    ),
+))
+
+# Raw Overpass results are cached on disk so reruns don't re-query OSM.
+# Delete the directory to force a refresh.
+OVERPASS_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.cache', 'overpass'))
+OVERPASS_CACHE_TTL_SECONDS = 7 * 86400
+
+
+def overpass_cache_path(query: str) -> str:
+    """Cache file for a query, keyed by the hash of its whitespace-normalized text."""
+    normalized = " ".join(query.split())
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return os.path.join(OVERPASS_CACHE_DIR, f"{digest}.json.gz")
+
+
+def read_overpass_cache(query: str) -> Optional[List[Dict]]:
+    """Cached elements for a query, or None if missing, stale, or unreadable."""
+    path = overpass_cache_path(query)
+    try:
+        if time.time() - os.path.getmtime(path) > OVERPASS_CACHE_TTL_SECONDS:
+            return None
+        with gzip.open(path, "rb") as f:
+            raw = f.read()
+        return (orjson.loads(raw) if orjson else json.loads(raw))["elements"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable Overpass cache {path}: {e}")
+        return None
+
+
+def write_overpass_cache(query: str, elements: List[Dict], source_url: str):
+    """Store query results; failures are logged and ignored."""
+    path = overpass_cache_path(query)
+    try:
+        os.makedirs(OVERPASS_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+                "source_url": source_url,
+                "elements": elements,
+            }, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write Overpass cache {path}: {e}")
+
+
+def build_overpass_query(scopes: List[str], timeout: int, preamble: str = "") -> str:
+    """
+    Build one Overpass QL query matching FACILITY_FILTERS in every scope.
+
+    Args:
+        scopes: Overpass spatial filters, e.g. "(36.6,-119.9,36.9,-119.6)" or "(area.searchArea)"
+        timeout: Query timeout in seconds
+        preamble: Statements placed before the union (e.g. area lookups)
+    """
+
+    statements = [
+        f"  {kind}{tag_filter}{scope};"
+        for scope in scopes
+        for tag_filter in FACILITY_FILTERS
+        for kind in ("node", "way")
+    ]
+    return f"[out:json][timeout:{timeout}];\n{preamble}(\n" + "\n".join(statements) + "\n);\nout center tags;"
+
+
+def bbox_scope(bbox: tuple) -> str:
+    """Overpass spatial filter for a (south, west, north, east) bounding box."""
+    south, west, north, east = bbox
+    return f"({south},{west},{north},{east})"
+
+
+_SLOTS_AVAILABLE = re.compile(r"^(\d+) slots? available now", re.MULTILINE)
+_SLOT_WAIT = re.compile(r"^Slot available after: \S+, in (\d+) seconds?", re.MULTILINE)
+_RATE_LIMIT = re.compile(r"^Rate limit: (\d+)", re.MULTILINE)
+
+# Longest single wait for an Overpass slot before polling /status again
+MAX_SLOT_WAIT_SECONDS = 60
+
+
+def overpass_slot_wait(overpass_url: str) -> Optional[int]:
+    """
+    Seconds until this client may run another query on an Overpass instance,
+    from its /api/status page.
+
+    Returns 0 if a slot is free now, or None if the status is unavailable
+    (not every instance serves it) so the caller just goes ahead.
+    """
+
+    status_url = overpass_url.rsplit("/", 1)[0] + "/status"
+    try:
+        response = overpass_session.get(status_url, timeout=10)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"Overpass status unavailable at {status_url}: {e}")
+        return None
+
+    status = response.text
+    rate_limit = _RATE_LIMIT.search(status)
+    if (rate_limit and rate_limit.group(1) == "0") or _SLOTS_AVAILABLE.search(status):
+        return 0
+
+    waits = [int(seconds) for seconds in _SLOT_WAIT.findall(status)]
+    return min(waits) if waits else None
+
+
+def wait_for_overpass_slot(overpass_url: str):
+    """Block until the Overpass instance reports a free query slot."""
+    while True:
+        wait = overpass_slot_wait(overpass_url)
+        if not wait:
+            return
+        wait = min(wait, MAX_SLOT_WAIT_SECONDS)
+        logger.info(f"No Overpass slot free on {overpass_url}, waiting {wait}s...")
+        time.sleep(wait)
+
+
+def run_overpass_query(query: str, label: str, timeout: int) -> List[Dict]:
+    """
+    Run an Overpass query, falling back to the next instance in OVERPASS_URLS on failure.
+
+    Results are served from the disk cache while fresh.
+
+    Returns list of OSM elements, or [] if every instance failed.
+    """
+
+    cached = read_overpass_cache(query)
+    if cached is not None:
+        logger.info(f"Found {len(cached)} facilities in {label} (cached)")
+        return cached
+
+    for overpass_url in OVERPASS_URLS:
+        wait_for_overpass_slot(overpass_url)
+        try:
+            response = overpass_session.post(
+                overpass_url,
+                data={"data": query},
+                timeout=timeout + 10
+            )
+            response.raise_for_status()
+            data = orjson.loads(response.content) if orjson else response.json()
+
+            # Timeouts and out-of-memory aborts come back as HTTP 200 with a
+            # remark and empty or partial elements; don't cache or use them
+            remark = data.get("remark") or ""
+            if "runtime error" in remark:
+                logger.error(f"Overpass error for {label} on {overpass_url}: {remark}")
+                continue
+
+            elements = data.get("elements", [])
+            write_overpass_cache(query, elements, overpass_url)
+
+            logger.info(f"Found {len(elements)} facilities in {label}")
+            return elements
+
+        except requests.exceptions.Timeout:
+            logger.error(f"Query timeout for {label} on {overpass_url} - try smaller area or increase timeout")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to query OSM for {label} on {overpass_url}: {e}")
+        except ValueError as e:
+            # orjson raises its own decode error, outside the requests hierarchy
+            logger.error(f"Invalid JSON from {overpass_url} for {label}: {e}")
+
+    return []
+
 
 def query_osm_facilities_bbox(bbox: tuple, region_name: str, timeout: int = 180) -> List[Dict]:
     """
@@ -79,53 +302,52 @@ def query_osm_facilities_bbox(bbox: tuple, region_name: str, timeout: int = 180)
     Returns list of facilities
     """
 
-    overpass_url = "http://overpass-api.de/api/interpreter"
+    logger.info(f"Querying OpenStreetMap for facilities in {region_name}...")
 
-    south, west, north, east = bbox
+    query = build_overpass_query([bbox_scope(bbox)], timeout)
+    return run_overpass_query(query, region_name, timeout)
 
-    # Overpass QL query with bounding box
-    query = f"""
-    [out:json][timeout:{timeout}];
-    (
-      // Truck stops (fuel stations that accept trucks)
-      node["amenity"="fuel"]["hgv"="yes"]({south},{west},{north},{east});
-      way["amenity"="fuel"]["hgv"="yes"]({south},{west},{north},{east});
 
-      // Rest areas
-      node["highway"="rest_area"]({south},{west},{north},{east});
-      way["highway"="rest_area"]({south},{west},{north},{east});
+def element_coordinates(element: Dict) -> Optional[tuple]:
+    """(lat, lon) of a node, or the center of a way; None if missing."""
+    if element.get("type") == "node":
+        lat, lon = element.get("lat"), element.get("lon")
+    else:
+        center = element.get("center", {})
+        lat, lon = center.get("lat"), center.get("lon")
+    if lat is None or lon is None:
+        return None
+    return lat, lon
 
-      // Truck parking
-      node["amenity"="parking"]["hgv"="yes"]({south},{west},{north},{east});
-      way["amenity"="parking"]["hgv"="yes"]({south},{west},{north},{east});
 
-      // Service areas
-      node["highway"="services"]({south},{west},{north},{east});
-      way["highway"="services"]({south},{west},{north},{east});
-    );
-    out center tags;
+def query_osm_facilities_bboxes(regions: Dict[str, tuple], timeout: int = 180) -> Dict[str, List[Dict]]:
     """
+    Query several bounding boxes with a single Overpass request.
 
-    logger.info(f"Querying OpenStreetMap for facilities in {region_name}...")
+    Each element is assigned to the first region whose box contains it, so
+    facilities in overlapping boxes are only returned once.
 
-    try:
-        response = requests.post(
-            overpass_url,
-            data={"data": query},
-            timeout=timeout + 10
-        )
-        response.raise_for_status()
-        data = response.json()
+    Returns mapping of region name to its OSM elements.
+    """
 
-        logger.info(f"Found {len(data.get('elements', []))} facilities in {region_name}")
-        return data.get("elements", [])
+    label = ", ".join(regions)
+    logger.info(f"Querying OpenStreetMap for facilities in {label}...")
 
-    except requests.exceptions.Timeout:
-        logger.error(f"Query timeout for {region_name} - try smaller bbox or increase timeout")
-        return []
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to query OSM for {region_name}: {e}")
-        return []
+    query = build_overpass_query([bbox_scope(bbox) for bbox in regions.values()], timeout)
+    elements = run_overpass_query(query, label, timeout)
+
+    by_region: Dict[str, List[Dict]] = {name: [] for name in regions}
+    for element in elements:
+        coordinates = element_coordinates(element)
+        if coordinates is None:
+            continue
+        lat, lon = coordinates
+        for name, (south, west, north, east) in regions.items():
+            if south <= lat <= north and west <= lon <= east:
+                by_region[name].append(element)
+                break
+
+    return by_region
 
 
 def query_osm_facilities(state: str, timeout: int = 180) -> List[Dict]:
@@ -139,53 +361,131 @@ def query_osm_facilities(state: str, timeout: int = 180) -> List[Dict]:
     - Service areas (highway=services)
     """
 
-    overpass_url = "http://overpass-api.de/api/interpreter"
+    logger.info(f"Querying OpenStreetMap for facilities in {state}...")
+
+    query = build_overpass_query(
+        ["(area.searchArea)"],
+        timeout,
+        preamble=f'area["ISO3166-1"="US"]["name"="{state}"]->.searchArea;\n',
+    )
+    return run_overpass_query(query, state, timeout)
 
-    # Overpass QL query
-    query = f"""
-    [out:json][timeout:{timeout}];
-    area["ISO3166-1"="US"]["name"="{state}"]->.searchArea;
-    (
-      // Truck stops (fuel stations that accept trucks)
-      node["amenity"="fuel"]["hgv"="yes"](area.searchArea);
-      way["amenity"="fuel"]["hgv"="yes"](area.searchArea);
 
-      // Rest areas
-      node["highway"="rest_area"](area.searchArea);
-      way["highway"="rest_area"](area.searchArea);
+# Geofabrik publishes daily per-state extracts, e.g. .../us/north-carolina-latest.osm.pbf
+GEOFABRIK_STATE_URL = "https://download.geofabrik.de/north-america/us/{slug}-latest.osm.pbf"
+PBF_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.cache', 'pbf'))
+PBF_CACHE_TTL_SECONDS = OVERPASS_CACHE_TTL_SECONDS
+PBF_DOWNLOAD_CHUNK_BYTES = 1024 * 1024
 
-      // Truck parking
-      node["amenity"="parking"]["hgv"="yes"](area.searchArea);
-      way["amenity"="parking"]["hgv"="yes"](area.searchArea);
 
-      // Service areas (often have truck facilities)
-      node["highway"="services"](area.searchArea);
-      way["highway"="services"](area.searchArea);
-    );
-    out center tags;
+def matches_facility_filters(tags) -> bool:
+    """Python equivalent of FACILITY_FILTERS, for sources other than Overpass."""
+    amenity = tags.get("amenity")
+    if amenity == "fuel" or amenity == "parking":
+        return tags.get("hgv") == "yes"
+    return tags.get("highway") in ("rest_area", "services")
+
+
+def download_state_pbf(state: str, timeout: int = 180) -> str:
     """
+    Download a state's Geofabrik extract, reusing a cached copy while fresh.
 
-    logger.info(f"Querying OpenStreetMap for facilities in {state}...")
+    Returns path of the .osm.pbf file.
+    """
 
-    try:
-        response = requests.post(
-            overpass_url,
-            data={"data": query},
-            timeout=timeout + 10
-        )
+    slug = state.lower().replace(" ", "-")
+    path = os.path.join(PBF_CACHE_DIR, f"{slug}-latest.osm.pbf")
+
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) <= PBF_CACHE_TTL_SECONDS:
+        logger.info(f"Using cached extract {path}")
+        return path
+
+    url = GEOFABRIK_STATE_URL.format(slug=slug)
+    logger.info(f"Downloading {url}...")
+
+    os.makedirs(PBF_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with overpass_session.get(url, stream=True, timeout=timeout) as response:
         response.raise_for_status()
-        data = response.json()
+        with open(tmp_path, "wb") as f:
+            for chunk in response.iter_content(PBF_DOWNLOAD_CHUNK_BYTES):
+                f.write(chunk)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def query_osm_facilities_pbf(state: str) -> List[Dict]:
+    """
+    Read truck-related facilities for a state from its Geofabrik PBF extract.
+
+    Same facilities as query_osm_facilities, returned in the Overpass
+    element shape (ways carry a bounding-box "center") so parse_osm_element
+    works unchanged, but parsed locally instead of waiting on Overpass.
 
-        logger.info(f"Found {len(data.get('elements', []))} facilities in {state}")
-        return data.get("elements", [])
+    Returns list of facilities, or [] on failure.
+    """
 
-    except requests.exceptions.Timeout:
-        logger.error(f"Query timeout for {state} - try increasing timeout value")
+    if osmium is None:
+        logger.error("pyosmium not installed; install with: pip install osmium")
         return []
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to query OSM for {state}: {e}")
+
+    try:
+        path = download_state_pbf(state)
+    except (requests.exceptions.RequestException, OSError) as e:
+        logger.error(f"Failed to download OSM extract for {state}: {e}")
+        return []
+
+    elements = []
+
+    class FacilityHandler(osmium.SimpleHandler):
+        def node(self, n):
+            if matches_facility_filters(n.tags) and n.location.valid():
+                elements.append({
+                    "type": "node",
+                    "id": n.id,
+                    "lat": n.location.lat,
+                    "lon": n.location.lon,
+                    "tags": {tag.k: tag.v for tag in n.tags},
+                })
+
+        def way(self, w):
+            if not matches_facility_filters(w.tags):
+                return
+            locations = [node.location for node in w.nodes if node.location.valid()]
+            if not locations:
+                return
+            lats = [location.lat for location in locations]
+            lons = [location.lon for location in locations]
+            elements.append({
+                "type": "way",
+                "id": w.id,
+                "center": {
+                    "lat": (min(lats) + max(lats)) / 2,
+                    "lon": (min(lons) + max(lons)) / 2,
+                },
+                "tags": {tag.k: tag.v for tag in w.tags},
+            })
+
+    logger.info(f"Reading OSM extract for {state}...")
+
+    try:
+        # locations=True resolves way node coordinates for the centers
+        FacilityHandler().apply_file(path, locations=True)
+    except RuntimeError as e:
+        logger.error(f"Failed to read OSM extract for {state}: {e}")
         return []
 
+    logger.info(f"Found {len(elements)} facilities in {state}")
+    return elements
+
+
+# Where state imports read OSM data from (--source)
+STATE_SOURCES = {
+    "overpass": query_osm_facilities,
+    "pbf": query_osm_facilities_pbf,
+}
+
 
 def parse_osm_element(element: Dict, state: str) -> Optional[Dict]:
     """
@@ -212,12 +512,13 @@ def parse_osm_element(element: Dict, state: str) -> Optional[Dict]:
     # Determine facility type
     amenity = tags.get("amenity")
     highway = tags.get("highway")
+    hgv = tags.get("hgv")
 
-    if amenity == "fuel" and tags.get("hgv") == "yes":
+    if amenity == "fuel" and hgv == "yes":
         facility_type = "truck_stop"
     elif highway == "rest_area":
         facility_type = "rest_area"
-    elif amenity == "parking" and tags.get("hgv") == "yes":
+    elif amenity == "parking" and hgv == "yes":
         facility_type = "truck_parking"
     elif highway == "services":
         facility_type = "service_area"
@@ -225,15 +526,17 @@ def parse_osm_element(element: Dict, state: str) -> Optional[Dict]:
         facility_type = "truck_stop"  # Default
 
     # Extract name
+    operator = tags.get("operator")
+    brand = tags.get("brand")
     name = (
         tags.get("name") or
-        tags.get("operator") or
-        tags.get("brand") or
+        operator or
+        brand or
         f"{facility_type.replace('_', ' ').title()} ({lat:.4f}, {lon:.4f})"
     )
 
     # Extract brand
-    brand = tags.get("brand") or tags.get("operator")
+    brand = brand or operator
 
     # Extract address info
     address = tags.get("addr:street")
@@ -251,7 +554,7 @@ def parse_osm_element(element: Dict, state: str) -> Optional[Dict]:
         amenities["diesel"] = True
     if tags.get("shop") == "convenience":
         amenities["convenience_store"] = True
-    if tags.get("amenity") == "restaurant" or "restaurant" in tags:
+    if amenity == "restaurant" or "restaurant" in tags:
         amenities["food"] = True
     if tags.get("shower") == "yes":
         amenities["showers"] = True
@@ -269,8 +572,8 @@ def parse_osm_element(element: Dict, state: str) -> Optional[Dict]:
     # Operating hours
     is_open_24h = tags.get("opening_hours") == "24/7"
 
-    # Build geohash (simplified - first 8 chars of lat/lon)
-    geohash = f"{int(lat * 10000):08x}{int(lon * 10000):08x}"[:12]
+    # Same precision as on-demand discovery, so its geohash prefix lookups match
+    geohash = gh.encode(lat, lon, precision=12)
 
     return {
         "name": name,
@@ -291,7 +594,112 @@ def parse_osm_element(element: Dict, state: str) -> Optional[Dict]:
     }
 
 
-def check_duplicate(facility: Dict, existing_facilities: List[Dict], threshold_miles: float = 0.1) -> bool:
+DUPLICATE_RADIUS_MILES = 0.1
+
+# Rows per request when loading existing facilities (PostgREST caps responses)
+EXISTING_PAGE_SIZE = 1000
+
+# Rows per insert request; PostgREST handles thousands per request easily
+BATCH_SIZE = 1000
+
+# Insert requests in flight at once
+INSERT_WORKERS = 4
+
+# Retries for rate-limited or failed inserts, backing off 1s, 2s, 4s...
+INSERT_RETRIES = 3
+RETRYABLE_STATUS_CODES = {"429", "500", "502", "503", "504"}
+
+
+def duplicate_search_box(facilities: List[Dict]) -> tuple:
+    """
+    (south, west, north, east) covering the facilities, padded by
+    DUPLICATE_RADIUS_MILES.
+
+    Longitude spans the whole globe near the poles or when the box would
+    wrap the antimeridian.
+    """
+
+    lats = [f["latitude"] for f in facilities]
+    lons = [f["longitude"] for f in facilities]
+    pad_lat = math.degrees(DUPLICATE_RADIUS_MILES / EARTH_RADIUS_MILES)
+    south, north = min(lats) - pad_lat, max(lats) + pad_lat
+
+    # Degrees of longitude shrink toward the poles
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    west, east = min(lons), max(lons)
+    if cos_lat <= 0.01 or east - west >= 180:
+        return south, -180.0, north, 180.0
+
+    pad_lon = pad_lat / cos_lat
+    return south, west - pad_lon, north, east + pad_lon
+
+
+def fetch_existing_facilities(box: tuple) -> List[Dict]:
+    """Load existing facilities inside a (south, west, north, east) box, a page at a time."""
+
+    south, west, north, east = box
+    query = db.from_("facilities").select("id,name,latitude,longitude") \
+        .gte("latitude", south) \
+        .lte("latitude", north) \
+        .gte("longitude", west) \
+        .lte("longitude", east) \
+        .order("id")
+
+    existing = []
+    while True:
+        page = query.range(len(existing), len(existing) + EXISTING_PAGE_SIZE - 1).execute().data or []
+        existing.extend(page)
+        if len(page) < EXISTING_PAGE_SIZE:
+            return existing
+
+
+class ExistingFacilityIndex:
+    """
+    Existing facilities bucketed into a spatial grid for duplicate checks,
+    shared across one run.
+
+    Each entry holds the name's word set, so duplicate checks only compare
+    names against the few facilities within DUPLICATE_RADIUS_MILES. Areas
+    already loaded aren't fetched again, and facilities inserted during the
+    run are added as they go, so later states and regions see them without
+    reloading anything.
+    """
+
+    def __init__(self):
+        self.grid = GridIndex(DUPLICATE_RADIUS_MILES)
+        self._ids = set()
+        self._loaded_boxes: List[tuple] = []
+
+    def add(self, rows: List[Dict]):
+        """Add facility rows (with id); rows already present are skipped."""
+        for row in rows:
+            if row["id"] in self._ids:
+                continue
+            self._ids.add(row["id"])
+            self.grid.add(row["latitude"], row["longitude"], (name_words(row["name"]), row["name"]))
+
+    def load_for(self, facilities: List[Dict]) -> int:
+        """
+        Make sure every existing facility that could match one of these is loaded.
+
+        Returns number of rows fetched (0 if the area was already loaded).
+        """
+
+        if not facilities:
+            return 0
+
+        south, west, north, east = box = duplicate_search_box(facilities)
+        for s, w, n, e in self._loaded_boxes:
+            if s <= south and w <= west and north <= n and east <= e:
+                return 0
+
+        rows = fetch_existing_facilities(box)
+        self.add(rows)
+        self._loaded_boxes.append(box)
+        return len(rows)
+
+
+def check_duplicate(facility: Dict, existing_index: GridIndex, threshold_miles: float = DUPLICATE_RADIUS_MILES) -> bool:
     """
     Check if facility is duplicate of existing facility.
 
@@ -299,31 +707,55 @@ def check_duplicate(facility: Dict, existing_facilities: List[Dict], threshold_m
     and have similar names.
     """
 
-    for existing in existing_facilities:
-        distance = calculate_distance(
-            facility["latitude"],
-            facility["longitude"],
-            existing["latitude"],
-            existing["longitude"]
-        )
-
-        if distance <= threshold_miles:
-            # Check name similarity
-            name1 = facility["name"].lower()
-            name2 = existing["name"].lower()
+    words = name_words(facility["name"])
 
-            # Simple similarity check
-            if name1 == name2 or name1 in name2 or name2 in name1:
-                logger.debug(f"Duplicate found: {facility['name']} matches {existing['name']}")
-                return True
+    for existing_words, existing_name in existing_index.nearby(facility["latitude"], facility["longitude"], threshold_miles):
+        if names_match(words, existing_words):
+            logger.debug(f"Duplicate found: {facility['name']} matches {existing_name}")
+            return True
 
     return False
 
 
-def import_facilities(facilities: List[Dict], dry_run: bool = False) -> int:
+def is_retryable(error: Exception) -> bool:
+    """Whether an insert failure is transient (rate limit, 5xx, network)."""
+    if isinstance(error, APIError):
+        # PostgREST reports the HTTP status as the code when the body isn't JSON
+        return str(error.code) in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+def insert_batch(batch: List[Dict]) -> List[Dict]:
+    """
+    Insert one batch of facilities, backing off on transient failures.
+
+    Returns the inserted rows.
+    """
+
+    for attempt in range(INSERT_RETRIES + 1):
+        try:
+            response = db.from_("facilities").insert(batch).execute()
+            return response.data or []
+        except Exception as e:
+            if attempt == INSERT_RETRIES or not is_retryable(e):
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"Insert failed ({e}), retrying in {delay}s")
+            time.sleep(delay)
+
+
+def import_facilities(
+    facilities: List[Dict],
+    dry_run: bool = False,
+    batch_size: int = BATCH_SIZE,
+    existing: Optional[ExistingFacilityIndex] = None,
+) -> int:
     """
     Import facilities into database.
 
+    Pass the same existing index for every call in a run so existing
+    facilities are only fetched once per area.
+
     Returns number of facilities imported.
     """
 
@@ -336,18 +768,20 @@ def import_facilities(facilities: List[Dict], dry_run: bool = False) -> int:
         return 0
 
     # Get existing facilities for duplicate checking
+    if existing is None:
+        existing = ExistingFacilityIndex()
+
     logger.info("Fetching existing facilities for duplicate checking...")
-    existing_response = db.from_("facilities").select("name,latitude,longitude").execute()
-    existing_facilities = existing_response.data if existing_response.data else []
+    fetched = existing.load_for(facilities)
 
-    logger.info(f"Found {len(existing_facilities)} existing facilities")
+    logger.info(f"Found {fetched} existing facilities ({len(existing.grid)} loaded this run)")
 
     # Filter out duplicates
     unique_facilities = []
     duplicates = 0
 
     for facility in facilities:
-        if not check_duplicate(facility, existing_facilities, threshold_miles=0.1):
+        if not check_duplicate(facility, existing.grid):
             unique_facilities.append(facility)
         else:
             duplicates += 1
@@ -358,42 +792,52 @@ def import_facilities(facilities: List[Dict], dry_run: bool = False) -> int:
         logger.info("No new facilities to import")
         return 0
 
-    # Import in batches of 100
-    batch_size = 100
-    imported = 0
-
-    for i in range(0, len(unique_facilities), batch_size):
-        batch = unique_facilities[i:i + batch_size]
+    batches = [unique_facilities[i:i + batch_size] for i in range(0, len(unique_facilities), batch_size)]
 
+    def insert(numbered_batch) -> List[Dict]:
+        number, batch = numbered_batch
         try:
-            response = db.from_("facilities").insert(batch).execute()
-
-            if response.data:
-                imported += len(response.data)
-                logger.info(f"Imported batch {i // batch_size + 1}: {len(response.data)} facilities")
-            else:
-                logger.warning(f"Batch {i // batch_size + 1} returned no data")
-
+            rows = insert_batch(batch)
         except Exception as e:
-            logger.error(f"Failed to import batch {i // batch_size + 1}: {e}")
-            continue
+            logger.error(f"Failed to import batch {number}: {e}")
+            return []
 
-        # Rate limiting - avoid hammering database
-        time.sleep(0.5)
+        if rows:
+            logger.info(f"Imported batch {number}: {len(rows)} facilities")
+        else:
+            logger.warning(f"Batch {number} returned no data")
+        return rows
+
+    # Batches are independent, so overlap their round trips
+    imported = 0
+    with ThreadPoolExecutor(max_workers=INSERT_WORKERS) as pool:
+        for rows in pool.map(insert, enumerate(batches, 1)):
+            imported += len(rows)
+            existing.add(rows)
 
     logger.info(f"Successfully imported {imported} facilities")
     return imported
 
 
-def import_region(region_name: str, bbox: tuple, dry_run: bool = False) -> int:
+def import_region(
+    region_name: str,
+    bbox: tuple,
+    dry_run: bool = False,
+    batch_size: int = BATCH_SIZE,
+    elements: Optional[List[Dict]] = None,
+    existing: Optional[ExistingFacilityIndex] = None,
+) -> int:
     """
     Import all facilities for a given region (bounding box).
+
+    Pass elements to skip the Overpass query (e.g. from query_osm_facilities_bboxes).
     """
 
     logger.info(f"{'[DRY RUN] ' if dry_run else ''}Starting import for region {region_name}")
 
     # Query OSM
-    elements = query_osm_facilities_bbox(bbox, region_name)
+    if elements is None:
+        elements = query_osm_facilities_bbox(bbox, region_name)
 
     if not elements:
         logger.warning(f"No facilities found for {region_name}")
@@ -413,22 +857,32 @@ def import_region(region_name: str, bbox: tuple, dry_run: bool = False) -> int:
     logger.info(f"Parsed {len(facilities)} valid facilities from {len(elements)} OSM elements")
 
     # Import
-    imported = import_facilities(facilities, dry_run=dry_run)
+    imported = import_facilities(facilities, dry_run=dry_run, batch_size=batch_size, existing=existing)
 
     logger.info(f"{'[DRY RUN] ' if dry_run else ''}Completed import for {region_name}: {imported} facilities")
 
     return imported
 
 
-def import_state(state: str, dry_run: bool = False) -> int:
+def import_state(
+    state: str,
+    dry_run: bool = False,
+    batch_size: int = BATCH_SIZE,
+    elements: Optional[List[Dict]] = None,
+    existing: Optional[ExistingFacilityIndex] = None,
+    source: str = "overpass",
+) -> int:
     """
     Import all facilities for a given state.
+
+    Pass elements to skip the OSM query (e.g. when prefetched).
     """
 
     logger.info(f"{'[DRY RUN] ' if dry_run else ''}Starting import for {state}")
 
     # Query OSM
-    elements = query_osm_facilities(state)
+    if elements is None:
+        elements = STATE_SOURCES[source](state)
 
     if not elements:
         logger.warning(f"No facilities found for {state}")
@@ -444,35 +898,56 @@ def import_state(state: str, dry_run: bool = False) -> int:
     logger.info(f"Parsed {len(facilities)} valid facilities from {len(elements)} OSM elements")
 
     # Import
-    imported = import_facilities(facilities, dry_run=dry_run)
+    imported = import_facilities(facilities, dry_run=dry_run, batch_size=batch_size, existing=existing)
 
     logger.info(f"{'[DRY RUN] ' if dry_run else ''}Completed import for {state}: {imported} facilities")
 
     return imported
 
 
-def import_all_states(dry_run: bool = False):
+def import_all_states(dry_run: bool = False, batch_size: int = BATCH_SIZE, source: str = "overpass"):
     """
     Import facilities for all major trucking states.
     """
 
+    query_state = STATE_SOURCES[source]
+
     logger.info(f"{'[DRY RUN] ' if dry_run else ''}Starting import for {len(MAJOR_STATES)} states")
 
     total_imported = 0
+    existing = ExistingFacilityIndex()
+
+    # OSM queries run ahead in the background; parsing, duplicate
+    # checks and inserts stay in order here so each state is checked
+    # against the facilities imported for the states before it. Only
+    # OVERPASS_WORKERS states are fetched ahead, since raw results for a
+    # large state can run to hundreds of MB.
+    remaining = iter(MAJOR_STATES)
+    with ThreadPoolExecutor(max_workers=OVERPASS_WORKERS) as pool:
+        pending = deque(
+            (state, pool.submit(query_state, state))
+            for state in islice(remaining, OVERPASS_WORKERS)
+        )
 
-    for state in MAJOR_STATES:
-        try:
-            imported = import_state(state, dry_run=dry_run)
-            total_imported += imported
-
-            # Rate limiting between states
-            if state != MAJOR_STATES[-1]:
-                logger.info("Waiting 10 seconds before next state...")
-                time.sleep(10)
-
-        except Exception as e:
-            logger.error(f"Failed to import {state}: {e}")
-            continue
+        while pending:
+            state, query = pending.popleft()
+            next_state = next(remaining, None)
+            if next_state is not None:
+                pending.append((next_state, pool.submit(query_state, next_state)))
+
+            try:
+                imported = import_state(
+                    state,
+                    dry_run=dry_run,
+                    batch_size=batch_size,
+                    elements=query.result(),
+                    existing=existing,
+                )
+                total_imported += imported
+
+            except Exception as e:
+                logger.error(f"Failed to import {state}: {e}")
+                continue
 
     logger.info(f"{'[DRY RUN] ' if dry_run else ''}Total imported across all states: {total_imported}")
 
@@ -484,29 +959,44 @@ def main():
     parser.add_argument("--all-states", action="store_true", help="Import all major trucking states")
     parser.add_argument("--all-regions", action="store_true", help="Import all defined regions")
     parser.add_argument("--dry-run", action="store_true", help="Preview without importing")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"Rows per insert request (default {BATCH_SIZE})")
+    parser.add_argument(
+        "--source",
+        choices=list(STATE_SOURCES),
+        default="overpass",
+        help="Where state imports read OSM data: Overpass API, or Geofabrik PBF extracts (needs pyosmium)",
+    )
 
     args = parser.parse_args()
 
     if args.all_states:
-        import_all_states(dry_run=args.dry_run)
+        import_all_states(dry_run=args.dry_run, batch_size=args.batch_size, source=args.source)
     elif args.all_regions:
         logger.info(f"{'[DRY RUN] ' if args.dry_run else ''}Importing all regions")
         total = 0
-        for region_name, bbox in REGION_BBOXES.items():
-            imported = import_region(region_name, bbox, dry_run=args.dry_run)
-            total += imported
-            if region_name != list(REGION_BBOXES.keys())[-1]:
-                logger.info("Waiting 5 seconds before next region...")
-                time.sleep(5)
+        existing = ExistingFacilityIndex()
+        region_names = list(REGION_BBOXES)
+        for i in range(0, len(region_names), MAX_BBOXES_PER_QUERY):
+            group = {name: REGION_BBOXES[name] for name in region_names[i:i + MAX_BBOXES_PER_QUERY]}
+            elements_by_region = query_osm_facilities_bboxes(group)
+            for region_name, bbox in group.items():
+                total += import_region(
+                    region_name,
+                    bbox,
+                    dry_run=args.dry_run,
+                    batch_size=args.batch_size,
+                    elements=elements_by_region[region_name],
+                    existing=existing,
+                )
         logger.info(f"{'[DRY RUN] ' if args.dry_run else ''}Total imported: {total} facilities")
     elif args.region:
         if args.region not in REGION_BBOXES:
             logger.error(f"Unknown region: {args.region}")
             logger.info(f"Available regions: {', '.join(REGION_BBOXES.keys())}")
             sys.exit(1)
-        import_region(args.region, REGION_BBOXES[args.region], dry_run=args.dry_run)
+        import_region(args.region, REGION_BBOXES[args.region], dry_run=args.dry_run, batch_size=args.batch_size)
     elif args.state:
-        import_state(args.state, dry_run=args.dry_run)
+        import_state(args.state, dry_run=args.dry_run, batch_size=args.batch_size, source=args.source)
     else:
         parser.print_help()
         sys.exit(1)
@@ -19,11 +19,45 @@ logger = logging.getLogger(__name__)
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SECRET_KEY = os.getenv("SUPABASE_SECRET_KEY")
 
+# Direct PostgreSQL connection; preferred over the exec_sql RPC when set
+DATABASE_URL = os.getenv("DATABASE_URL")
+
 if not SUPABASE_URL or not SUPABASE_SECRET_KEY:
     raise ValueError("Missing SUPABASE_URL or SUPABASE_SECRET_KEY")
 
 db = create_client(SUPABASE_URL, SUPABASE_SECRET_KEY)
 
+def run_migration_direct(sql: str) -> bool:
+    """
+    Execute the whole migration over a direct connection in one transaction.
+
+    libpq accepts multi-statement strings, so this is a single round trip and
+    isn't confused by semicolons inside $$ function bodies.
+
+    Returns False if a direct connection isn't available (no DATABASE_URL or
+    psycopg2), so the caller can fall back to the RPC path.
+    """
+
+    if not DATABASE_URL:
+        return False
+
+    try:
+        import psycopg2
+    except ImportError:
+        logger.warning("psycopg2 not installed, falling back to exec_sql RPC")
+        return False
+
+    conn = psycopg2.connect(DATABASE_URL)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+    finally:
+        conn.close()
+
+    return True
+
+
 def run_migration(migration_file: str):
     """Apply a SQL migration"""
 
@@ -34,6 +68,14 @@ def run_migration(migration_file: str):
 
     logger.info("Executing migration SQL...")
 
+    try:
+        if run_migration_direct(sql):
+            logger.info("✅ Migration completed successfully!")
+            return
+    except Exception as e:
+        logger.error(f"❌ Migration failed (rolled back): {e}")
+        sys.exit(1)
+
     try:
         # Split by semicolons to execute statement by statement
         statements = [s.strip() for s in sql.split(';') if s.strip() and not s.strip().startswith('--')]
@@ -10,20 +10,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from dotenv import load_dotenv
 load_dotenv()
 
-from supabase import create_client
+from app.database import get_db_admin
 from app.services.facility_discovery import find_nearby_facility, query_osm_nearby, parse_osm_element
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SECRET_KEY = os.getenv("SUPABASE_SECRET_KEY")
-
-if not SUPABASE_URL or not SUPABASE_SECRET_KEY:
-    raise ValueError("Missing SUPABASE credentials")
-
-db = create_client(SUPABASE_URL, SUPABASE_SECRET_KEY)
+# Shared admin client (same singleton the API uses)
+db = get_db_admin()
 
 def test_madera():
     """Test Madera, CA specifically"""
@@ -105,17 +100,18 @@ def test_madera():
     logger.info("Step 3: Check database...")
     logger.info("="*80)
 
-    # Count facilities from openstreetmap
+    # Count facilities from openstreetmap, fetching only the rows we show
     result = db.from_("facilities") \
-        .select("*") \
+        .select("name,type,latitude,longitude,osm_id", count="exact") \
         .eq("data_source", "openstreetmap") \
+        .limit(5) \
         .execute()
 
-    logger.info(f"\nFacilities from OSM in database: {len(result.data)}")
+    logger.info(f"\nFacilities from OSM in database: {result.count}")
 
     if result.data:
         logger.info("\nRecently imported from OSM:")
-        for i, fac in enumerate(result.data[:5], 1):
+        for i, fac in enumerate(result.data, 1):
             logger.info(f"  {i}. {fac['name']} ({fac['type']})")
             logger.info(f"     Location: ({fac['latitude']:.4f}, {fac['longitude']:.4f})")
             logger.info(f"     OSM ID: {fac.get('osm_id')}")
@@ -10,18 +10,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from dotenv import load_dotenv
 load_dotenv()
 
-from supabase import create_client
-from app.services.facility_discovery import find_nearby_facility
+from app.database import get_db_admin
+from app.services.facility_discovery import find_nearby_facility, METERS_PER_MILE
 from app.utils.location import calculate_distance
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SECRET_KEY = os.getenv("SUPABASE_SECRET_KEY")
-
-db = create_client(SUPABASE_URL, SUPABASE_SECRET_KEY)
+# Shared admin client (same singleton the API uses)
+db = get_db_admin()
 
 def test_near_facility():
     """Test if we can find Love's when driver is close by"""
@@ -77,23 +75,23 @@ def test_near_facility():
     else:
         logger.info(f"❌ No facility found")
 
-    # Show all facilities in Madera area
+    # Show the facilities closest to Madera center
     logger.info("\n" + "="*80)
-    logger.info("All facilities in Madera area:")
+    logger.info("Nearest facilities to Madera center:")
     logger.info("="*80)
 
-    result = db.from_("facilities") \
-        .select("name,type,latitude,longitude,data_source") \
-        .eq("data_source", "openstreetmap") \
-        .order("created_at", desc=True) \
-        .limit(10) \
-        .execute()
+    # Ordered and measured server-side by nearest_facilities() (migration 019)
+    result = db.rpc("nearest_facilities", {
+        "p_latitude": 36.9613,
+        "p_longitude": -120.0607,
+        "p_limit": 10,
+        "p_data_source": "openstreetmap",
+    }).execute()
 
     for i, fac in enumerate(result.data, 1):
-        dist = calculate_distance(36.9613, -120.0607, fac["latitude"], fac["longitude"])
         logger.info(f"{i}. {fac['name']} ({fac['type']})")
         logger.info(f"   Location: ({fac['latitude']:.4f}, {fac['longitude']:.4f})")
-        logger.info(f"   Distance from Madera center: {dist:.2f} miles")
+        logger.info(f"   Distance from Madera center: {fac['distance_meters'] / METERS_PER_MILE:.2f} miles")
 
 
 if __name__ == "__main__":
@@ -4,23 +4,39 @@ Test warehouse/shipper/distribution center discovery
 
 import os
 import sys
+from collections import Counter
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from supabase import create_client
+from app.database import get_db_admin
 from app.services.facility_discovery import find_nearby_facility, discover_facilities, query_osm_nearby
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SECRET_KEY = os.getenv("SUPABASE_SECRET_KEY")
+# Shared admin client (same singleton the API uses)
+db = get_db_admin()
 
-db = create_client(SUPABASE_URL, SUPABASE_SECRET_KEY)
+# (tag, accepted values or None for any value, category label), first match wins
+CATEGORY_RULES = (
+    ("building", {"warehouse", "industrial"}, "building={}"),
+    ("industrial", None, "industrial={}"),
+    ("amenity", {"fuel"}, "fuel"),
+    ("highway", None, "highway={}"),
+)
+
+
+def categorize_tags(tags: dict) -> str:
+    """Bucket an OSM element's tags into a category for the breakdown"""
+    for key, allowed, label in CATEGORY_RULES:
+        value = tags.get(key)
+        if value and (allowed is None or value in allowed):
+            return label.format(value)
+    return "other"
 
 def test_warehouse_area():
     """Test discovery in an area known to have warehouses"""
@@ -42,29 +58,13 @@ def test_warehouse_area():
 
     if elements:
         logger.info("\nBreakdown by type:")
-        types_count = {}
+        types_count = Counter()
         sample_by_type = {}
 
         for element in elements:
             tags = element.get("tags", {})
-            building = tags.get("building", "")
-            amenity = tags.get("amenity", "")
-            highway = tags.get("highway", "")
-            industrial = tags.get("industrial", "")
-
-            # Categorize
-            if building in ["warehouse", "industrial"]:
-                category = f"building={building}"
-            elif industrial:
-                category = f"industrial={industrial}"
-            elif amenity == "fuel":
-                category = "fuel"
-            elif highway:
-                category = f"highway={highway}"
-            else:
-                category = "other"
-
-            types_count[category] = types_count.get(category, 0) + 1
+            category = categorize_tags(tags)
+            types_count[category] += 1
 
             # Save sample
             if category not in sample_by_type:
@@ -116,10 +116,7 @@ def test_warehouse_area():
             logger.info(f"   Location: ({fac['latitude']:.4f}, {fac['longitude']:.4f})")
 
         # Count by type
-        type_counts = {}
-        for fac in result.data:
-            t = fac["type"]
-            type_counts[t] = type_counts.get(t, 0) + 1
+        type_counts = Counter(fac["type"] for fac in result.data)
 
         logger.info("\nFacility types discovered:")
         for t, count in type_counts.items():
@@ -0,0 +1,55 @@
+"""
+Test Spatial Index
+Checks GridIndex radius lookups against a brute-force distance scan
+"""
+
+import sys
+import os
+import random
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.location import is_within_distance
+from app.utils.spatial_index import GridIndex
+
+
+def _random_points(rng, center_lat, center_lon, spread, count):
+    points = []
+    for i in range(count):
+        lat = max(-90.0, min(90.0, center_lat + rng.uniform(-spread, spread)))
+        lon = (center_lon + rng.uniform(-spread, spread) + 180.0) % 360.0 - 180.0
+        points.append((lat, lon, i))
+    return points
+
+
+def test_nearby_matches_brute_force():
+    """nearby() returns exactly the points is_within_distance accepts"""
+    rng = random.Random(42)
+
+    # Mid-latitudes, near the antimeridian and near a pole
+    for center_lat, center_lon in [(36.96, -120.06), (51.0, 179.99), (89.9, 0.0)]:
+        points = _random_points(rng, center_lat, center_lon, 0.05, 300)
+
+        for cell_miles, radius in [(0.1, 0.1), (0.1, 1.0), (5.0, 0.5)]:
+            index = GridIndex(cell_miles)
+            for lat, lon, item in points:
+                index.add(lat, lon, item)
+            assert len(index) == len(points)
+
+            for query_lat, query_lon, _ in points[:50]:
+                expected = {
+                    item for lat, lon, item in points
+                    if is_within_distance(query_lat, query_lon, lat, lon, radius)
+                }
+                assert set(index.nearby(query_lat, query_lon, radius)) == expected
+
+
+def test_nearby_empty_and_whole_earth():
+    """Empty index finds nothing; a radius past the antipode finds everything"""
+    index = GridIndex(0.1)
+    assert list(index.nearby(0.0, 0.0, 10.0)) == []
+
+    index.add(10.0, 20.0, "a")
+    index.add(-45.0, -170.0, "b")
+    assert set(index.nearby(0.0, 0.0, 20000.0)) == {"a", "b"}
@@ -5,16 +5,15 @@ Tests the weather API service and follow-up question integration
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.weather_api import (
     get_weather_alerts,
-    has_severe_alerts,
-    get_most_severe_alert,
     get_alert_emoji,
-    should_warn_driver
+    summarize_alerts
 )
 from app.services.follow_up_engine import FollowUpEngine
 
@@ -35,13 +34,18 @@ def test_weather_api():
         (36.7783, -119.4179, "Fresno, CA (fog/heat)"),
     ]
 
-    for lat, lng, name in test_locations:
+    # Lookups are network-bound, so fetch all locations at once and
+    # report in order as each result is needed
+    with ThreadPoolExecutor(max_workers=len(test_locations)) as pool:
+        lookups = [pool.submit(get_weather_alerts, lat, lng) for lat, lng, _ in test_locations]
+
+    for (lat, lng, name), lookup in zip(test_locations, lookups):
         print(f"\n{name}")
         print(f"Location: ({lat}, {lng})")
         print("-" * 60)
 
         try:
-            alerts = get_weather_alerts(lat, lng)
+            alerts = lookup.result()
 
             if not alerts:
                 print("✓ No active weather alerts")
@@ -57,18 +61,19 @@ def test_weather_api():
                 print(f"  Emoji: {get_alert_emoji(alert.event)}")
                 print(f"  Headline: {alert.headline[:100]}...")
 
+            summary = summarize_alerts(alerts)
+
             # Test severity check
-            if has_severe_alerts(alerts):
+            if summary.has_severe:
                 print("\n  ⚠️  SEVERE/EXTREME ALERT DETECTED")
 
             # Test most severe
-            most_severe = get_most_severe_alert(alerts)
-            if most_severe:
-                print(f"\n  Most Severe: {most_severe.event}")
+            if summary.most_severe:
+                print(f"\n  Most Severe: {summary.most_severe.event}")
 
             # Test driver warning logic
             for status in ["rolling", "parked", "waiting"]:
-                if should_warn_driver(alerts, status):
+                if summary.should_warn(status):
                     print(f"  → Should warn {status.upper()} drivers")
 
         except Exception as e: